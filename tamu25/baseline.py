@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import logging
+import math
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable
+
+from .compression import read_input
+from .model import IdIndex, group_by_index
+from .serialization import dump, dumps, loads
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = Path(".tamu25-cache") / "baseline.idx"
+# outside teams/, where it would pass for a real team
+DEFAULT_SUBMISSION_PATH = Path(".tamu25-cache") / "baseline_submission.json"
+_TOKEN = re.compile(r"[a-z0-9]+")
+# persisted arrays, in file order
+_ARRAYS = ("offsets", "docs", "weights")
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    BM25 inverted index over product titles.
+
+    Postings are stored CSR-style in flat arrays: term t's postings are `docs[offsets[t]:offsets[t+1]]`
+    (product indices, ascending), and `weights` holds each posting's precomputed BM25 term weight, so
+    scoring a query only sums weights.
+    """
+
+    def __init__(
+        self,
+        products: IdIndex,
+        terms: IdIndex,
+        offsets: array,
+        docs: array,
+        weights: array,
+        catalog_sha256: str | None = None,
+    ) -> None:
+        self.products = products
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.weights = weights
+        self.catalog_sha256 = catalog_sha256
+
+    @classmethod
+    def build(
+        cls,
+        products: Iterable[tuple[str, str]],
+        k1: float = 1.2,
+        b: float = 0.75,
+        catalog_sha256: str | None = None,
+    ) -> BM25Index:
+        """Index (product_id, title) pairs."""
+        product_index = IdIndex()
+        terms = IdIndex()
+        term_col, doc_col, tf_col = array("i"), array("i"), array("i")
+        doc_len = array("i")
+        for pid, title in products:
+            doc = product_index.add(pid)
+            if doc < len(doc_len):
+                continue  # duplicate product id: keep the first title
+            tokens = tokenize(title or "")
+            doc_len.append(len(tokens))
+            counts: dict[int, int] = {}
+            for token in tokens:
+                t = terms.add(token)
+                counts[t] = counts.get(t, 0) + 1
+            for t, tf in counts.items():
+                term_col.append(t)
+                doc_col.append(doc)
+                tf_col.append(tf)
+
+        n_docs = len(product_index)
+        avgdl = sum(doc_len) / n_docs if n_docs else 0.0
+        offsets, (docs, tfs) = group_by_index(term_col, len(terms), doc_col, tf_col)
+        weights = array("f", bytes(4 * len(docs)))
+        for t in range(len(terms)):
+            start, end = offsets[t], offsets[t + 1]
+            idf = math.log(1 + (n_docs - (end - start) + 0.5) / (end - start + 0.5))
+            for i in range(start, end):
+                tf = tfs[i]
+                norm = k1 * (1 - b + b * doc_len[docs[i]] / avgdl) if avgdl else k1
+                weights[i] = idf * tf * (k1 + 1) / (tf + norm)
+        logger.info(f"indexed {n_docs} products, {len(terms)} terms, {len(docs)} postings")
+        return cls(product_index, terms, offsets, docs, weights, catalog_sha256)
+
+    @classmethod
+    def from_catalog(cls, products_path: str | Path) -> BM25Index:
+        """
+        Index a products.json catalog in either shape validation accepts: objects with
+        product_id/title, or bare product id strings (indexed with empty titles).
+        """
+        data = read_input(products_path)
+        catalog = []
+        for p in loads(data):
+            if isinstance(p, str):
+                catalog.append((p, ""))
+            elif isinstance(p, dict):
+                if p.get("product_id"):
+                    catalog.append((p["product_id"], p.get("title") or ""))
+            else:
+                raise ValueError(f"{products_path}: catalog entries must be product objects or id strings, got {p!r}")
+        if catalog and not any(title for _, title in catalog):
+            logger.warning(f"{products_path} has no product titles; the baseline will rank in catalog order")
+        return cls.build(catalog, catalog_sha256=hashlib.sha256(data).hexdigest())
+
+    def search(self, query: str, top_k: int = 30) -> list[tuple[int, float]]:
+        """Top `top_k` (product index, score) pairs, best first."""
+        spans = [(self.offsets[t], self.offsets[t + 1]) for t in map(self.terms.get, tokenize(query)) if t >= 0]
+        if not spans:
+            return []
+        # seed the accumulator from the longest postings list in one C-level pass
+        spans.sort(key=lambda span: span[0] - span[1])
+        start, end = spans[0]
+        scores: dict[int, float] = dict(zip(self.docs[start:end], self.weights[start:end]))
+        for start, end in spans[1:]:
+            for doc, w in zip(self.docs[start:end], self.weights[start:end]):
+                scores[doc] = scores.get(doc, 0.0) + w
+        return [(doc, scores[doc]) for doc in heapq.nlargest(top_k, scores, key=scores.__getitem__)]
+
+    # -------- Persistence --------
+    def save(self, path: str | Path) -> None:
+        """One JSON header line (ids, array sizes) followed by the raw postings arrays."""
+        header = {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "catalog_sha256": self.catalog_sha256,
+            "products": self.products.ids,
+            "terms": self.terms.ids,
+            "arrays": {name: [getattr(self, name).typecode, len(getattr(self, name))] for name in _ARRAYS},
+        }
+        with open(path, "wb") as f:
+            f.write(dumps(header).encode("utf-8"))
+            f.write(b"\n")
+            for name in _ARRAYS:
+                getattr(self, name).tofile(f)
+
+    @classmethod
+    def load(cls, path: str | Path) -> BM25Index:
+        with open(path, "rb") as f:
+            header = loads(f.readline())
+            if header.get("version") != INDEX_VERSION:
+                raise ValueError(f"unsupported baseline index version {header.get('version')} in {path}")
+            arrays = {}
+            for name in _ARRAYS:
+                typecode, length = header["arrays"][name]
+                arrays[name] = array(typecode)
+                arrays[name].fromfile(f, length)
+                if header["byteorder"] != sys.byteorder:
+                    arrays[name].byteswap()
+        products, terms = IdIndex(header["products"]), IdIndex(header["terms"])
+        return cls(products, terms, catalog_sha256=header["catalog_sha256"], **arrays)
+
+
+def load_or_build_index(products_path: str | Path, index_path: str | Path | None = None) -> BM25Index:
+    """Reuse the index at `index_path` if it was built from this exact catalog, else (re)build and save it."""
+    if index_path is not None and Path(index_path).exists():
+        try:
+            index = BM25Index.load(index_path)
+            if index.catalog_sha256 == hashlib.sha256(read_input(products_path)).hexdigest():
+                logger.info(f"loaded baseline index from {index_path}")
+                return index
+            logger.info(f"catalog changed since {index_path} was built, rebuilding")
+        except Exception as e:
+            logger.warning(f"ignoring unreadable baseline index {index_path}: {e}")
+    index = BM25Index.from_catalog(products_path)
+    if index_path is not None:
+        Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+        index.save(index_path)
+        logger.info(f"saved baseline index to {index_path}")
+    return index
+
+
+def retrieve(index: BM25Index, queries: Iterable[dict[str, any]], top_k: int = 30) -> list[dict[str, any]]:
+    """
+    Submission rows for every query: the BM25 top `top_k`, padded with the remaining catalog products
+    in catalog order when fewer than `top_k` products match, so each query gets `top_k` distinct results.
+    """
+    rows = []
+    ids = index.products.ids
+    for q in queries:
+        qid = q["query_id"]
+        ranked = [doc for doc, _ in index.search(q.get("query", ""), top_k)]
+        if len(ranked) < top_k:
+            hit = set(ranked)
+            ranked += [doc for doc in range(min(len(ids), top_k + len(hit))) if doc not in hit][: top_k - len(ranked)]
+        rows += [{"query_id": qid, "rank": r, "product_id": ids[doc]} for r, doc in enumerate(ranked, start=1)]
+    return rows
+
+
+def build_baseline_submission(
+    products_path: str | Path,
+    queries_paths: Iterable[str | Path],
+    out: str | Path,
+    index_path: str | Path | None = None,
+    top_k: int = 30,
+) -> dict[str, any]:
+    """Write a BM25 baseline submission for every query in `queries_paths`."""
+    index = load_or_build_index(products_path, index_path)
+    queries = []
+    for path in queries_paths:
+        queries += loads(read_input(path))
+    rows = retrieve(index, queries, top_k)
+    dump(rows, out, indent=None)
+    logger.info(f"wrote {len(rows)} baseline rows for {len(queries)} queries to {out}")
+    return {"queries": len(queries), "rows": len(rows), "out": str(out)}
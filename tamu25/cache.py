@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from .serialization import dump, load
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SHARED_PREFIX = "validation-cache"
+
+
+def file_sha256(path: str | Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def cache_key(version: int | str, *paths: str | Path | None) -> str:
+    """Key over a version tag and the contents of `paths` (None marks an omitted input)."""
+    h = hashlib.sha256(f"v{version}".encode("utf-8"))
+    for path in paths:
+        h.update(b"\0" + (file_sha256(path).encode("ascii") if path is not None else b"-"))
+    return h.hexdigest()
+
+
+class ValidationCache:
+    """
+    Validation reports keyed by content hash, stored as <key>.json under `root`.
+
+    Entries are evicted least-recently-used (by file mtime, refreshed on every hit) once there are
+    more than `max_entries`. An optional `shared` store (LocalStorage or GCSStorage) is checked on
+    a local miss and receives every new entry, so runners can share results.
+    """
+
+    def __init__(self, root: str | Path, max_entries: int = 256, shared: any = None) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.shared = shared
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, any] | None:
+        path = self._path(key)
+        if not path.exists() and self.shared is not None:
+            blob = f"{SHARED_PREFIX}/{key}.json"
+            try:
+                if self.shared.exists(blob):
+                    self.shared.fetch(blob, path)
+            except Exception as e:
+                logger.warning(f"shared validation cache unavailable: {e}")
+        try:
+            report = load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"dropping unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return report
+
+    def put(self, key: str, report: dict[str, any]) -> None:
+        # write-then-rename so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        dump(report, tmp)
+        os.replace(tmp, self._path(key))
+        if self.shared is not None:
+            try:
+                self.shared.upload(self._path(key), f"{SHARED_PREFIX}/{key}.json")
+            except Exception as e:
+                logger.warning(f"could not upload to shared validation cache: {e}")
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for path in self.root.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:  # evicted by a concurrent writer since the glob
+                continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            path.unlink(missing_ok=True)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 import os
 import platform
@@ -10,7 +10,20 @@ import fire
 from google.cloud import storage
 
 from tamu25 import get_version
+from tamu25.baseline import DEFAULT_INDEX_PATH, DEFAULT_SUBMISSION_PATH, build_baseline_submission
+from tamu25.cache import ValidationCache
+from tamu25.compression import compress_file
 from tamu25.evaluate import full_evaluation
+from tamu25.golden import build_ideal_dcg_table
+from tamu25.history import LeaderboardHistory, normalize_ts
+from tamu25.jobqueue import SubmissionQueue
+from tamu25.leaderboard import HISTORY_DB
+from tamu25.manifest import build_manifest, manifest_path
+from tamu25.pipeline import publish_score, run_pipeline, scoring_inputs_digest
+from tamu25.preview import preview_evaluation
+from tamu25.serialization import dump, dumps
+from tamu25.similarity import SimilarityIndex
+from tamu25.storage import GCSStorage, LocalStorage
 from tamu25.validate import validate_submission
 
 # Configure logging
@@ -26,10 +39,15 @@ class CLI:
         self,
         submission: str,
         products: str,
-        queries_synth: str,
         team: str,
+        queries_synth: str = None,
         queries_real: str = None,
         out: str = "validation_report.json",
+        memory_limit_mb: float = None,
+        cache_dir: str = None,
+        shared_cache_dir: str = None,
+        cache_bucket: str = None,
+        manifest: str = None,
     ) -> None:
         """
         Validate a team submission JSON file.
@@ -49,26 +67,51 @@ class CLI:
             --queries_synth data/queries_synth.json \\
             --team team_alpha \\
             --out validation_report.json
+
+        Submissions larger than RAM can be validated out-of-core by passing
+        --memory_limit_mb; rows are then spilled to sorted runs on disk and
+        checked one query at a time.
+
+        Pass --cache_dir to reuse the report of an earlier run on byte-identical inputs
+        (submission, catalog, queries). --shared_cache_dir (a directory) or --cache_bucket
+        (a GCS bucket) additionally shares cached reports between runners.
+
+        Pass --manifest (from `tamu25 build-manifest`) instead of --queries_synth/--queries_real
+        to take the required queries from the split manifest without reading the query files.
         """
+        if queries_synth is None and manifest is None:
+            raise ValueError("either --queries_synth or --manifest is required")
         queries_real_path = Path(queries_real) if queries_real is not None else None
 
+        cache = None
+        if cache_dir is not None:
+            shared = None
+            if cache_bucket is not None:
+                shared = GCSStorage(cache_bucket)
+            elif shared_cache_dir is not None:
+                shared = LocalStorage(shared_cache_dir)
+            cache = ValidationCache(cache_dir, shared=shared)
+
         report = validate_submission(
             submission_path=Path(submission),
             products_path=Path(products),
             queries_real_path=queries_real_path,
-            queries_synth_path=Path(queries_synth),
+            queries_synth_path=Path(queries_synth) if queries_synth is not None else None,
             team=team,
+            memory_limit_mb=memory_limit_mb,
+            cache=cache,
+            manifest_path=Path(manifest) if manifest is not None else None,
         )
-        Path(out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        dump(report, out)
         status = report.get("status", "failed")
         headline = ":white_check_mark: Validation passed" if status == "passed" else ":x: Validation failed"
 
         if status == "passed":
             logger.info(f"{headline} for team {team}")
-            logger.info(json.dumps(report, indent=2))
+            logger.info(dumps(report, indent=2))
         else:
             logger.error(f"{headline} for team {team}")
-            logger.error(json.dumps(report, indent=2))
+            logger.error(dumps(report, indent=2))
             raise SystemExit(1)
 
     def evaluate(
@@ -77,7 +120,14 @@ class CLI:
         labels_synth: str,
         team: str,
         labels_real: str = None,
-        out: str = "score_report.json",
+        out: str = None,
+        memory_limit_mb: float = None,
+        queries_synth: str = None,
+        queries_real: str = None,
+        manifest: str = None,
+        preview: bool = False,
+        tolerance: float = 0.01,
+        confidence: float = 0.95,
     ) -> None:
         """
         Evaluate a validated team submission against golden sets.
@@ -95,18 +145,342 @@ class CLI:
             --labels_synth data/labels_synth.json \\
             --team team_alpha \\
             --out score_report.json
+
+        Pass --memory_limit_mb to score submissions larger than RAM with an
+        external sort (one query in memory at a time).
+
+        Scores are also broken down by query set, relevant-product count and (when
+        --queries_synth/--queries_real are given) query length under "segments".
+        With --manifest, query lengths come from the manifest instead (the scores are the same);
+        label files that do not match the manifest are refused.
+
+        Pass --preview for an estimate from a stratified query sample that grows until
+        the composite's confidence interval (--confidence, default 0.95) is within
+        ± --tolerance (default 0.01). Sampling only saves scoring time: the submission and
+        labels are still parsed in full. The estimate goes to preview_report.json unless --out
+        is given, so it never replaces score_report.json. The full score is still authoritative.
         """
+        if out is None:
+            out = "preview_report.json" if preview else "score_report.json"
         labels_real_path = Path(labels_real) if labels_real is not None else None
 
-        report = full_evaluation(
-            submission_path=Path(submission),
-            labels_real_path=labels_real_path,
-            labels_synth_path=Path(labels_synth),
-            team=team,
-        )
-        Path(out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        if preview:
+            if memory_limit_mb is not None:
+                raise ValueError("--preview cannot be combined with --memory_limit_mb")
+            report = preview_evaluation(
+                submission_path=Path(submission),
+                labels_real_path=labels_real_path,
+                labels_synth_path=Path(labels_synth),
+                team=team,
+                tolerance=tolerance,
+                confidence=confidence,
+            )
+            final = report["combined"]
+            logger.info(f"preview score: {final['weighted_final']} ± {final['bound']} ({confidence:.0%} confidence)")
+        else:
+            report = full_evaluation(
+                submission_path=Path(submission),
+                labels_real_path=labels_real_path,
+                labels_synth_path=Path(labels_synth),
+                team=team,
+                memory_limit_mb=memory_limit_mb,
+                queries_paths=[Path(q) for q in (queries_real, queries_synth) if q is not None],
+                manifest_path=Path(manifest) if manifest is not None else None,
+            )
+        dump(report, out)
         logger.info(f":checkered_flag: Evaluation completed for team {team}")
-        logger.info(json.dumps(report, indent=2))
+        logger.info(dumps(report, indent=2))
+
+    def run(
+        self,
+        submission: str,
+        products: str,
+        labels_synth: str,
+        team: str,
+        queries_synth: str = None,
+        queries_real: str = None,
+        labels_real: str = None,
+        bucket_name: str = None,
+        storage_root: str = ".",
+        out_dir: str = ".",
+        leaderboard_dir: str = None,
+        run_id: str = None,
+        manifest: str = None,
+    ) -> None:
+        """
+        Validate, evaluate and publish a submission in a single concurrent pipeline.
+        Labels are fetched while the submission is validated, and queries that pass
+        validation are scored as they are checked. `labels_synth`/`labels_real` are blob
+        names in `bucket_name`, or paths under `storage_root` when no bucket is given.
+        Example:
+          tamu25 run \\
+            --submission teams/team_alpha/submission.json \\
+            --products data/products.json \\
+            --queries_synth data/queries_synth_test.json \\
+            --labels_synth labels_synth.json \\
+            --bucket_name my-bucket \\
+            --team team_alpha \\
+            --out_dir . \\
+            --leaderboard_dir leaderboard
+
+        For an offline run against local files:
+          tamu25 run \\
+            --submission teams/team_alpha/submission.json \\
+            --products tests/data/products.json \\
+            --queries_synth tests/data/queries_synth.json \\
+            --labels_synth tests/data/labels_synth.json \\
+            --team team_alpha
+
+        --manifest (from `tamu25 build-manifest`) can replace --queries_synth/--queries_real; the
+        run is refused if the manifest no longer matches the query files or the fetched labels.
+        """
+        storage = GCSStorage(bucket_name) if bucket_name is not None else LocalStorage(storage_root)
+        result = asyncio.run(
+            run_pipeline(
+                submission_path=Path(submission),
+                products_path=Path(products),
+                queries_synth_path=Path(queries_synth) if queries_synth is not None else None,
+                labels_synth_blob=labels_synth,
+                team=team,
+                storage=storage,
+                queries_real_path=Path(queries_real) if queries_real is not None else None,
+                labels_real_blob=labels_real,
+                out_dir=Path(out_dir),
+                leaderboard_dir=Path(leaderboard_dir) if leaderboard_dir is not None else None,
+                run_id=run_id,
+                manifest_path=Path(manifest) if manifest is not None else None,
+            )
+        )
+        if result["score"] is None:
+            logger.error(f":x: Validation failed for team {team}")
+            logger.error(dumps(result["validation"], indent=2))
+            raise SystemExit(1)
+        logger.info(f":checkered_flag: Pipeline completed for team {team}")
+        logger.info(dumps(result["score"], indent=2))
+
+    def queue(
+        self,
+        action: str = "stats",
+        queue_dir: str = ".tamu25-queue",
+        team: str = None,
+        submission: str = None,
+        products: str = None,
+        queries_synth: str = None,
+        labels_synth: str = None,
+        queries_real: str = None,
+        labels_real: str = None,
+        bucket_name: str = None,
+        storage_root: str = ".",
+        leaderboard_dir: str = None,
+        max_workers: int = 2,
+        manifest: str = None,
+    ) -> any:
+        """
+        Local scoring queue. A team's newer submission replaces its queued one, identical content
+        is never scored twice against the same catalog, queries and labels (even across teams), and
+        teams are served least-recently-first by a bounded worker pool.
+        Actions:
+          enqueue  queue --submission for --team
+          run      score queued jobs (same inputs as `tamu25 run`) until the queue is empty
+          stats    queue depth and wait/run latency
+          list     every job and its state
+        Example:
+          tamu25 queue --action enqueue --team team_alpha --submission teams/team_alpha/submission.json
+          tamu25 queue --action run \\
+            --products data/products.json \\
+            --queries_synth data/queries_synth_test.json \\
+            --labels_synth labels_synth.json \\
+            --bucket_name my-bucket \\
+            --leaderboard_dir leaderboard \\
+            --max_workers 4
+        """
+        with SubmissionQueue(queue_dir) as jobs:
+            if action == "enqueue":
+                if team is None or submission is None:
+                    raise ValueError("--team and --submission are required to enqueue")
+                result = jobs.enqueue(team, Path(submission))
+            elif action == "run":
+                if products is None or labels_synth is None or (queries_synth is None and manifest is None):
+                    raise ValueError("--products, --labels_synth and --queries_synth or --manifest are required to run")
+                storage = GCSStorage(bucket_name) if bucket_name is not None else LocalStorage(storage_root)
+
+                def score(job: dict) -> dict:
+                    return asyncio.run(
+                        run_pipeline(
+                            submission_path=Path(job["submission"]),
+                            products_path=Path(products),
+                            queries_synth_path=Path(queries_synth) if queries_synth is not None else None,
+                            labels_synth_blob=labels_synth,
+                            team=job["team"],
+                            storage=storage,
+                            queries_real_path=Path(queries_real) if queries_real is not None else None,
+                            labels_real_blob=labels_real,
+                            out_dir=Path(queue_dir) / "runs" / str(job["id"]),
+                            run_id=f"queue-{job['id']}",
+                            manifest_path=Path(manifest) if manifest is not None else None,
+                        )
+                    )
+
+                def publish(job: dict, result: dict) -> None:
+                    # leaderboard writes happen here, one job at a time, not on the workers
+                    if leaderboard_dir is not None and result["score"] is not None:
+                        run_id = f"queue-{job['id']}"
+                        publish_score(leaderboard_dir, job["team"], run_id, result["score"], job["submission"])
+
+                inputs = scoring_inputs_digest(
+                    storage,
+                    Path(products),
+                    Path(queries_synth) if queries_synth is not None else None,
+                    labels_synth,
+                    Path(queries_real) if queries_real is not None else None,
+                    labels_real,
+                    Path(manifest) if manifest is not None else None,
+                )
+                jobs.drain(score, max_workers=max_workers, on_result=publish, inputs=inputs)
+                result = jobs.stats()
+            elif action == "stats":
+                result = jobs.stats()
+            elif action == "list":
+                result = jobs.jobs()
+            else:
+                raise ValueError(f"unknown queue action '{action}', expected enqueue|run|stats|list")
+        logger.info(dumps(result, indent=2))
+        return result
+
+    def history(
+        self,
+        query: str = "best",
+        leaderboard_dir: str = "leaderboard",
+        team: str = None,
+        since: str = None,
+        cursor: int = 0,
+    ) -> any:
+        """
+        Query the leaderboard history store (new runs under <leaderboard_dir>/runs are recorded first).
+        Queries:
+          best        best-ever weighted_final per team
+          trajectory  every run of --team in time order
+          changes     rank changes since --since (ISO 8601, UTC if no offset, e.g. 2025-11-08T18:00:00Z)
+          feed        runs and rank changes recorded after --cursor
+        Example:
+          tamu25 history --query changes --since 2025-11-08T18:00:00Z
+        """
+        since = normalize_ts(str(since)) if since is not None else None
+        with LeaderboardHistory(Path(leaderboard_dir) / HISTORY_DB) as store:
+            store.import_runs(Path(leaderboard_dir) / "runs")
+            if query == "best":
+                result = store.best_per_team()
+            elif query == "trajectory":
+                if team is None:
+                    raise ValueError("--team is required for the trajectory query")
+                result = store.trajectory(team)
+            elif query == "changes":
+                result = store.rank_changes(since_ts=since)
+            elif query == "feed":
+                result = store.feed(cursor)
+            else:
+                raise ValueError(f"unknown history query '{query}', expected best|trajectory|changes|feed")
+        logger.info(dumps(result, indent=2))
+        return result
+
+    def baseline(
+        self,
+        products: str,
+        queries_synth: str,
+        queries_real: str = None,
+        out: str = str(DEFAULT_SUBMISSION_PATH),
+        index: str = str(DEFAULT_INDEX_PATH),
+        top_k: int = 30,
+    ) -> dict:
+        """
+        Write a reference BM25 submission (product titles only) for every real and synthetic query
+        to --out (default .tamu25-cache/baseline_submission.json, outside teams/ so it is never
+        mistaken for a team). The inverted index is saved to --index (default
+        .tamu25-cache/baseline.idx) and reused while the catalog is unchanged.
+        Example:
+          tamu25 baseline \\
+            --products data/products.json \\
+            --queries_synth data/queries_synth_train.json
+        """
+        queries = [Path(q) for q in (queries_real, queries_synth) if q is not None]
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        return build_baseline_submission(Path(products), queries, Path(out), Path(index), top_k)
+
+    def similarity(
+        self,
+        teams_dir: str = "teams",
+        index: str = "leaderboard/similarity.sqlite",
+        min_rbo: float = 0.8,
+        submission: str = None,
+        team: str = None,
+    ) -> list:
+        """
+        Flag near-identical submissions across teams. New submissions are sketched (MinHash over
+        top-ranked query/product pairs plus top-10 lists of sampled queries) and added to an LSH
+        index, then cross-team pairs with rank-biased overlap >= --min_rbo are reported.
+        Example:
+          tamu25 similarity --teams_dir teams --min_rbo 0.8
+          tamu25 similarity --submission teams/team_alpha/submission.json --team team_alpha
+        """
+        with SimilarityIndex(index) as store:
+            if submission is not None:
+                if team is None:
+                    raise ValueError("--team is required with --submission")
+                store.add(team, Path(submission))
+            else:
+                store.add_teams(Path(teams_dir))
+            pairs = store.suspicious_pairs(min_rbo)
+        logger.info(dumps(pairs, indent=2))
+        return pairs
+
+    def prepare_labels(self, labels: str) -> str:
+        """
+        Precompute every query's ideal DCG from the full golden set and store it next to the
+        label file (labels_x.json -> labels_x.idcg.json). Re-run whenever the labels change;
+        a stale table is detected by hash and ignored.
+        Example:
+          tamu25 prepare_labels --labels data/labels_synth.json
+        """
+        out = build_ideal_dcg_table(Path(labels))
+        return str(out)
+
+    def build_manifest(
+        self,
+        split: str,
+        queries_synth: str,
+        queries_real: str = None,
+        labels_synth: str = None,
+        labels_real: str = None,
+        out: str = None,
+    ) -> str:
+        """
+        Build the manifest of one split (train/test): sorted query ids, per-query word, label and
+        relevant-product counts, and the sha256 of every input. validate, evaluate, run and queue
+        accept --manifest in place of the query files. Re-run whenever the queries or labels change.
+        Example:
+          tamu25 build-manifest \\
+            --split train \\
+            --queries_synth data/queries_synth_train.json \\
+            --labels_synth data/labels_synth_train.json
+        """
+        labels = {"synthetic": labels_synth, "real": labels_real}
+        out_path = Path(out) if out is not None else manifest_path(split)
+        build_manifest(
+            split,
+            [Path(q) for q in (queries_real, queries_synth) if q is not None],
+            {kind: Path(path) for kind, path in labels.items() if path is not None},
+            out_path,
+        )
+        return str(out_path)
+
+    def compress(self, path: str, out: str = None, codec: str = "gzip") -> str:
+        """
+        Compress an input file (gzip, zstd or xz). Every command reads compressed files directly,
+        detecting the format from the file's first bytes.
+        Example:
+          tamu25 compress --path data/labels_synth.json --codec zstd
+        """
+        return str(compress_file(Path(path), Path(out) if out is not None else None, codec))
 
     # -------- Utility Commands --------
     def version(self) -> str:
@@ -130,7 +504,7 @@ class CLI:
                 "CI_PIPELINE_ID": os.environ.get("CI_PIPELINE_ID"),
             },
         }
-        logger.info(json.dumps(info, indent=2))
+        logger.info(dumps(info, indent=2))
         return info
 
     def download_gcs_file(
@@ -191,9 +565,9 @@ class CLI:
             # Create parent directories if they don't exist
             destination_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Download the blob to the local file
+            # Download the blob to the local file, compressed as stored (the loaders decompress it)
             try:
-                blob.download_to_filename(str(destination_path))
+                blob.download_to_filename(str(destination_path), raw_download=True)
                 logger.info(f"Successfully downloaded {source_blob_name} to {destination_path}")
             except Exception as e:
                 logger.error(f"Failed to download file: {e}")
@@ -0,0 +1,133 @@
+"""
+Transparent compressed input.
+
+Every loader opens its input through `open_input`, which recognizes gzip, zstd and xz files by
+their magic bytes (whatever the file is called) and decompresses them as a stream. zstd needs the
+optional `zstandard` package; gzip and xz use the standard library.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import logging
+import lzma
+import shutil
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+try:
+    import zstandard
+except ImportError:  # optional codec
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+CODECS = ("gzip", "zstd", "xz")
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "xz": ".xz"}
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+_MAGIC_LEN = max(len(magic) for magic, _ in _MAGIC)
+
+
+def detect(head: bytes) -> str | None:
+    """Codec name for a file starting with `head`, or None for uncompressed data."""
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def detect_file(path: str | Path) -> str | None:
+    with open(path, "rb") as f:
+        return detect(f.read(_MAGIC_LEN))
+
+
+def _require_zstd(path: str | Path) -> None:
+    if zstandard is None:
+        raise ValueError(f"{path} is zstd-compressed; install the optional 'zstandard' package to read it")
+
+
+def open_input(path: str | Path) -> BinaryIO:
+    """Open `path` for binary reading, decompressing on the fly if it is gzip/zstd/xz compressed."""
+    codec = detect_file(path)
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "xz":
+        return lzma.open(path, "rb")
+    if codec == "zstd":
+        _require_zstd(path)
+        return zstandard.open(path, "rb")
+    return open(path, "rb")
+
+
+def open_text(path: str | Path, encoding: str = "utf-8") -> TextIO:
+    """Text-mode `open_input`."""
+    if detect_file(path) is None:
+        return open(path, "r", encoding=encoding)
+    return io.TextIOWrapper(open_input(path), encoding=encoding)
+
+
+def read_input(path: str | Path) -> bytes:
+    """Whole (decompressed) content of `path`."""
+    with open_input(path) as f:
+        return f.read()
+
+
+def compress_bytes(data: bytes, codec: str = "gzip") -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, mtime=0)
+    if codec == "xz":
+        return lzma.compress(data)
+    if codec == "zstd":
+        _require_zstd("output")
+        return zstandard.ZstdCompressor().compress(data)
+    raise ValueError(f"unknown codec '{codec}', expected one of {CODECS}")
+
+
+def compress_file(source: str | Path, destination: str | Path | None = None, codec: str = "gzip") -> Path:
+    """
+    Stream-compress `source` into `destination` (default: `source` plus .gz/.zst/.xz, replacing any
+    compression suffix it already has). A source already compressed with `codec` is copied as it is;
+    one compressed with another codec is decompressed and re-encoded, so the content always matches
+    the destination's suffix. The output is written to a temporary file next to `destination` and
+    moved into place, so `destination` may be `source` itself.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec '{codec}', expected one of {CODECS}")
+    source = Path(source)
+    if destination is None:
+        stem = source.with_suffix("") if source.suffix in SUFFIXES.values() else source
+        destination = stem.with_name(stem.name + SUFFIXES[codec])
+    destination = Path(destination)
+    source_codec = detect_file(source)
+    if source_codec == codec:
+        if source.resolve() != destination.resolve():
+            shutil.copyfile(source, destination)
+        return destination
+
+    source_size = source.stat().st_size
+    tmp = destination.with_name(f".{destination.name}.tmp")
+    try:
+        raw = open(tmp, "wb")
+        if codec == "gzip":
+            # the gzip header names the destination, not the temporary file
+            out = gzip.GzipFile(destination.name, "wb", fileobj=raw, mtime=0)
+        elif codec == "xz":
+            out = lzma.open(raw, "wb")
+        else:
+            _require_zstd(destination)
+            out = zstandard.open(raw, "wb")
+        with raw, open_input(source) as src, out:
+            shutil.copyfileobj(src, out, 1 << 20)
+        tmp.replace(destination)
+    finally:
+        tmp.unlink(missing_ok=True)
+    logger.info(f"compressed {source} ({source_size} bytes) to {destination} ({destination.stat().st_size} bytes)")
+    return destination
@@ -1,91 +1,133 @@
 from __future__ import annotations
 
-import json
 import logging
-from collections import defaultdict
 from pathlib import Path
+from typing import Sequence
 
+from .external import sorted_query_groups
+from .golden import load_golden_set
+from .manifest import Manifest
 from .metrics import average_precision, ndcg_at_k, precision_at_k, recall_at_k
+from .model import METRIC_NAMES, GoldenSet, IdIndex, Submission
+from .segments import Segmentation, load_query_words
+from .serialization import SubmissionRow, iter_array, load_rows
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def _load_json(path: str | Path) -> any:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def _load_submission(path: str | Path) -> list[SubmissionRow]:
+    return load_rows(path, SubmissionRow, strict=False)
 
 
-def _build_label_lookup(labels: list[dict[str, any]]) -> tuple[dict[str, dict[str, int]], dict[str, int]]:
-    lookup: dict[str, dict[str, int]] = defaultdict(dict)
-    relevant_counts: dict[str, int] = defaultdict(int)
-    for row in labels:
-        qid = row["query_id"]
-        pid = row["product_id"]
-        rel = row["relevance"]
-        lookup[qid][pid] = rel
-        if rel >= 1:
-            relevant_counts[qid] += 1
-    return lookup, relevant_counts
+def _score_query(products: Sequence[int], golden: GoldenSet, query_id: str) -> dict[str, float]:
+    """Score one query's rank-ordered product indices against its labels."""
+    qlabels = golden.relevance_map(query_id)
+    total_rel = golden.relevant_count(query_id)
+    rels: list[int] = []
+    bin_rels: list[int] = []
+    for pid in products:
+        rel = qlabels.get(pid, 0)
+        rels.append(rel)
+        bin_rels.append(1 if rel >= 1 else 0)
 
+    # Calculate individual metrics
+    ndcg_10 = ndcg_at_k(rels, 10, golden.ideal_dcg_at(query_id, 10))
+    ap_20 = average_precision(bin_rels, total_rel, 20)
+    p_10 = precision_at_k(bin_rels, 10)
+    r_30 = recall_at_k(bin_rels, total_rel, 30)
 
-def evaluate_submission(
-    submission_path: str | Path,
-    labels_path: str | Path,
-    k_list: tuple[int, ...] = (5, 10, 20),
+    # Calculate composite metric: 0.30 · nDCG@10 + 0.30 · AP@20 + 0.25 · R@30 + 0.15 · P@10
+    composite = 0.30 * ndcg_10 + 0.30 * ap_20 + 0.25 * r_30 + 0.15 * p_10
+
+    return {"nDCG@10": ndcg_10, "AP@20": ap_20, "P@10": p_10, "R@30": r_30, "composite": composite}
+
+
+def _score_submission(
+    submission: Submission, golden: GoldenSet, segmentation: Segmentation | None = None
 ) -> dict[str, any]:
-    submission = _load_json(submission_path)
-    labels = _load_json(labels_path)
-
-    label_lookup, relevant_counts = _build_label_lookup(labels)
-
-    # group submission
-    per_query: dict[str, list[tuple[int, str]]] = defaultdict(list)
-    for row in submission:
-        per_query[row["query_id"]].append((row["rank"], row["product_id"]))
-
-    metrics_acc: dict[str, list[float]] = {
-        "nDCG@10": [], "AP@20": [], "P@10": [], "R@30": [], "composite": []
-    }
-
-    for qid, rows in per_query.items():
-        rows_sorted = sorted(rows, key=lambda x: x[0])
-        rels: list[int] = []
-        bin_rels: list[int] = []
-        for _, pid in rows_sorted:
-            rel = label_lookup[qid].get(pid, 0)
-            rels.append(rel)
-            bin_rels.append(1 if rel >= 1 else 0)
-
-        total_rel = relevant_counts[qid]
-
-        # Calculate individual metrics
-        ndcg_10 = ndcg_at_k(rels, 10)
-        ap_20 = average_precision(bin_rels, total_rel, 20)
-        p_10 = precision_at_k(bin_rels, 10)
-        r_30 = recall_at_k(bin_rels, total_rel, 30)
-        
-        # Calculate composite metric: 0.30 · nDCG@10 + 0.30 · AP@20 + 0.25 · R@30 + 0.15 · P@10
-        composite = 0.30 * ndcg_10 + 0.30 * ap_20 + 0.25 * r_30 + 0.15 * p_10
-
-        metrics_acc["nDCG@10"].append(ndcg_10)
-        metrics_acc["AP@20"].append(ap_20)
-        metrics_acc["P@10"].append(p_10)
-        metrics_acc["R@30"].append(r_30)
-        metrics_acc["composite"].append(composite)
+    metrics_acc = _new_accumulator()
+    for view in submission:
+        _accumulate(metrics_acc, _score_query(view.products, golden, view.query_id), view.query_id)
+    return _summarize(metrics_acc, len(submission.queries), segmentation)
+
 
+def _new_accumulator() -> dict[str, list]:
+    """Per-query metric arrays (one list per metric) plus the query id of each position."""
+    acc: dict[str, list] = {name: [] for name in METRIC_NAMES}
+    acc["query_id"] = []
+    return acc
+
+
+def _accumulate(metrics_acc: dict[str, list], scores: dict[str, float], query_id: str) -> None:
+    for name in METRIC_NAMES:
+        metrics_acc[name].append(scores[name])
+    metrics_acc["query_id"].append(query_id)
+
+
+def _summarize(
+    metrics_acc: dict[str, list], queries_scored: int, segmentation: Segmentation | None = None
+) -> dict[str, any]:
     def _avg(lst: list[float]) -> float:
         return round(sum(lst) / len(lst), 4) if lst else 0.0
 
-    return {
-        "nDCG@10": _avg(metrics_acc["nDCG@10"]),
-        "AP@20": _avg(metrics_acc["AP@20"]),
-        "P@10": _avg(metrics_acc["P@10"]),
-        "R@30": _avg(metrics_acc["R@30"]),
-        "composite": _avg(metrics_acc["composite"]),
-        "queries_scored": len(per_query),
-    }
+    summary: dict[str, any] = {name: _avg(metrics_acc[name]) for name in METRIC_NAMES}
+    summary["queries_scored"] = queries_scored
+    if segmentation is not None:
+        summary["segments"] = segmentation.reduce(metrics_acc["query_id"], metrics_acc)
+    return summary
+
+
+def _score_external(
+    submission_path: str | Path,
+    golden: GoldenSet,
+    memory_limit_mb: float,
+    segmentation: Segmentation | None = None,
+) -> dict[str, any]:
+    """Stream the submission through an external sort and score it one query at a time."""
+    products = golden.products
+    fields = ((row["query_id"], row["rank"], row["product_id"]) for row in iter_array(submission_path))
+    metrics_acc = _new_accumulator()
+    queries_scored = 0
+    for qid, rows in sorted_query_groups(fields, memory_limit_mb):
+        ranked = [products.get(pid) for _, pid in rows]
+        _accumulate(metrics_acc, _score_query(ranked, golden, qid), qid)
+        queries_scored += 1
+    return _summarize(metrics_acc, queries_scored, segmentation)
+
+
+def evaluate_submission(
+    submission_path: str | Path,
+    labels_path: str | Path,
+    k_list: tuple[int, ...] = (5, 10, 20),
+    memory_limit_mb: float | None = None,
+    query_words: dict[str, int] | None = None,
+    manifest: Manifest | None = None,
+    kind: str | None = None,
+) -> dict[str, any]:
+    """
+    Score a submission against one label set. With `memory_limit_mb`, the submission is never held
+    in memory as a whole: it is streamed, externally sorted by query and scored one query at a time.
+    Per-segment means (see `Segmentation`) are reported under "segments"; `query_words` (query_id ->
+    number of words) adds the query-length segments.
+    With a split `manifest`, `labels_path` must be the manifest's `kind` ("synthetic"/"real") label
+    file (else StaleManifestError) and query lengths come from the manifest; the queries scored are
+    the same as without it.
+    """
+    if manifest is not None:
+        if kind is None:
+            raise ValueError("kind is required when scoring against a manifest")
+        manifest.check_labels(kind, labels_path)
+        query_words = query_words if query_words is not None else manifest.query_words()
+    products = IdIndex()
+    golden = load_golden_set(labels_path, products)
+    segmentation = Segmentation(golden, query_words)
+    if memory_limit_mb is not None:
+        return _score_external(submission_path, golden, memory_limit_mb, segmentation)
+
+    submission = Submission.from_rows(_load_submission(submission_path), products)
+    return _score_submission(submission, golden, segmentation)
 
 
 def full_evaluation(
@@ -95,11 +137,36 @@ def full_evaluation(
     team: str,
     w_real: float = 0.7,
     w_synth: float = 0.3,
+    memory_limit_mb: float | None = None,
+    queries_paths: Sequence[str | Path] | None = None,
+    manifest_path: str | Path | None = None,
 ) -> dict[str, any]:
-    synth_metrics = evaluate_submission(submission_path, labels_synth_path)
-
+    """
+    `queries_paths` (queries_*.json) are only read for the query-length segments. A `manifest_path`
+    (see `tamu25 build-manifest`) replaces them, and each label set must match the manifest; the
+    scores are the same as with the query files.
+    """
+    manifest = None
+    if manifest_path is not None:
+        manifest = Manifest.load(manifest_path)
+        manifest.check_sources()
+    query_words = load_query_words(queries_paths) if queries_paths and manifest is None else None
+    options = {"memory_limit_mb": memory_limit_mb, "query_words": query_words, "manifest": manifest}
+    synth_metrics = evaluate_submission(submission_path, labels_synth_path, kind="synthetic", **options)
+    real_metrics = None
     if labels_real_path is not None:
-        real_metrics = evaluate_submission(submission_path, labels_real_path)
+        real_metrics = evaluate_submission(submission_path, labels_real_path, kind="real", **options)
+    return _combine(team, synth_metrics, real_metrics, w_real, w_synth)
+
+
+def _combine(
+    team: str,
+    synth_metrics: dict[str, any],
+    real_metrics: dict[str, any] | None,
+    w_real: float = 0.7,
+    w_synth: float = 0.3,
+) -> dict[str, any]:
+    if real_metrics is not None:
         final_score = round(
             w_real * real_metrics["composite"] + w_synth * synth_metrics["composite"],
             4,
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import tempfile
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Rough in-memory cost of one buffered (query_id, rank, product_id) tuple, used to turn a
+# memory cap into a run length.
+_ROW_BYTES = 256
+# Most run files open at once while merging; more runs are merged in several passes.
+MAX_FAN_IN = 64
+
+
+def _sort_key(row: tuple[str, int, str]) -> tuple[str, int]:
+    return row[0], row[1]
+
+
+def _write_rows(rows: Iterable[tuple[str, int, str]], path: Path) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row))
+            f.write("\n")
+    return path
+
+
+def _write_run(rows: list[tuple[str, int, str]], run_dir: Path, run_no: int) -> Path:
+    rows.sort(key=_sort_key)
+    return _write_rows(rows, run_dir / f"run-{run_no:05d}.jsonl")
+
+
+def _read_run(path: Path) -> Iterator[tuple[str, int, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            qid, rank, pid = json.loads(line)
+            yield qid, rank, pid
+
+
+def _merge_passes(runs: list[Path], run_dir: Path, fan_in: int) -> list[Path]:
+    """
+    Merge consecutive groups of `fan_in` runs into single runs until at most `fan_in` remain, so
+    no more than `fan_in` run files are ever open at once. Merging consecutive runs keeps the sort
+    stable.
+    """
+    passes = 0
+    while len(runs) > fan_in:
+        passes += 1
+        merged_runs = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i : i + fan_in]
+            if len(group) == 1:
+                merged_runs.append(group[0])
+                continue
+            path = run_dir / f"pass-{passes:02d}-{i // fan_in:05d}.jsonl"
+            _write_rows(heapq.merge(*(_read_run(run) for run in group), key=_sort_key), path)
+            for run in group:
+                run.unlink()
+            merged_runs.append(path)
+        runs = merged_runs
+    if passes:
+        logger.info(f"reduced sorted runs to {len(runs)} in {passes} merge pass(es)")
+    return runs
+
+
+def sorted_query_groups(
+    fields: Iterable[tuple[str, int, str]],
+    memory_limit_mb: float,
+    tmp_dir: str | Path | None = None,
+    fan_in: int = MAX_FAN_IN,
+) -> Iterator[tuple[str, list[tuple[int, str]]]]:
+    """
+    External sort of (query_id, rank, product_id) triples by query_id then rank.
+
+    Rows are buffered up to roughly `memory_limit_mb`, then each full buffer is sorted and spilled
+    to a run file under `tmp_dir`. The runs are k-way merged (at most `fan_in` at a time, in
+    several passes if needed) and yielded one query at a time as
+    (query_id, [(rank, product_id), ...]). The sort is stable, so rows with equal ranks keep their
+    input order. Run files are removed when the generator is exhausted or closed.
+    """
+    max_rows = max(1, int(memory_limit_mb * 2**20) // _ROW_BYTES)
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="tamu25-sort-") as tmp:
+        run_dir = Path(tmp)
+        runs: list[Path] = []
+        buffer: list[tuple[str, int, str]] = []
+        for row in fields:
+            buffer.append(row)
+            if len(buffer) >= max_rows:
+                runs.append(_write_run(buffer, run_dir, len(runs)))
+                buffer = []
+
+        if runs:
+            if buffer:
+                runs.append(_write_run(buffer, run_dir, len(runs)))
+                buffer = []
+            logger.info(f"merging {len(runs)} sorted runs")
+            runs = _merge_passes(runs, run_dir, max(2, fan_in))
+            merged = heapq.merge(*(_read_run(path) for path in runs), key=_sort_key)
+        else:
+            # everything fit in memory: no spill needed
+            buffer.sort(key=_sort_key)
+            merged = iter(buffer)
+
+        for qid, group in groupby(merged, key=lambda x: x[0]):
+            yield qid, [(rank, pid) for _, rank, pid in group]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+
+from .compression import SUFFIXES, read_input
+from .model import DCG_CUTOFFS, GoldenSet, IdIndex
+from .serialization import LabelRow, dump, load, parse_rows
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def ideal_dcg_path(labels_path: str | Path) -> Path:
+    """
+    Sidecar file holding the precomputed ideal DCG table, e.g. labels_synth.json -> labels_synth.idcg.json
+    (a compression suffix is dropped first: labels_synth.json.gz -> labels_synth.idcg.json).
+    """
+    labels_path = Path(labels_path)
+    if labels_path.suffix in SUFFIXES.values():
+        labels_path = labels_path.with_suffix("")
+    return labels_path.with_suffix(".idcg.json")
+
+
+def _read_ideal_dcg(labels_path: Path, labels_sha256: str) -> dict[int, dict[str, float]] | None:
+    path = ideal_dcg_path(labels_path)
+    if not path.exists():
+        return None
+    try:
+        table = load(path)
+    except Exception as e:
+        logger.warning(f"ignoring unreadable ideal DCG table {path}: {e}")
+        return None
+    if table.get("labels_sha256") != labels_sha256:
+        logger.warning(f"ignoring stale ideal DCG table {path}: labels have changed")
+        return None
+    return {int(k): values for k, values in table["ideal_dcg"].items()}
+
+
+def load_labels(labels_path: str | Path) -> tuple[list[LabelRow], dict[int, dict[str, float]] | None]:
+    """Load label rows plus the precomputed ideal DCG table, if one exists for this exact label file."""
+    labels_path = Path(labels_path)
+    data = read_input(labels_path)
+    rows = parse_rows(data, LabelRow, strict=False)
+    return rows, _read_ideal_dcg(labels_path, hashlib.sha256(data).hexdigest())
+
+
+def load_golden_set(labels_path: str | Path, products: IdIndex | None = None) -> GoldenSet:
+    rows, ideal_dcg = load_labels(labels_path)
+    return GoldenSet.from_rows(rows, products, ideal_dcg)
+
+
+def build_ideal_dcg_table(labels_path: str | Path, cutoffs: tuple[int, ...] = DCG_CUTOFFS) -> Path:
+    """
+    Precompute every query's ideal DCG@k (for each cutoff) from the full golden set and store it
+    next to the label file, tagged with the labels' sha256 so a changed label file invalidates it.
+    """
+    labels_path = Path(labels_path)
+    data = read_input(labels_path)
+    golden = GoldenSet.from_rows(parse_rows(data, LabelRow, strict=False))
+    table = {
+        "labels_sha256": hashlib.sha256(data).hexdigest(),
+        "cutoffs": list(cutoffs),
+        "ideal_dcg": {str(k): dict(zip(golden.queries.ids, golden.compute_ideal_dcg(k))) for k in cutoffs},
+    }
+    out = ideal_dcg_path(labels_path)
+    dump(table, out)
+    logger.info(f"wrote ideal DCG table for {len(golden.queries)} queries to {out}")
+    return out
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .serialization import dumps, load, loads
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    team           TEXT NOT NULL,
+    run_key        TEXT NOT NULL,
+    pipeline_id    TEXT,
+    timestamp_utc  TEXT,
+    weighted_final REAL NOT NULL,
+    score_report   TEXT NOT NULL,
+    metadata       TEXT NOT NULL,
+    UNIQUE (team, run_key)
+);
+CREATE INDEX IF NOT EXISTS runs_team_ts ON runs (team, timestamp_utc);
+CREATE INDEX IF NOT EXISTS runs_ts ON runs (timestamp_utc);
+CREATE TABLE IF NOT EXISTS imported_teams (
+    team           TEXT PRIMARY KEY,
+    mtime_ns       INTEGER NOT NULL
+);
+"""
+
+# Team directories modified this recently are rescanned on the next import, since a run may still
+# be being written (and coarse filesystem timestamps may not change again when it lands).
+_SETTLE_NS = 2 * 10**9
+
+# Latest run per team (ties on timestamp go to the most recently recorded run),
+# optionally restricted to runs recorded up to a given id and/or timestamp.
+_LATEST_SQL = """
+SELECT id, team, weighted_final, score_report, metadata FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY team ORDER BY timestamp_utc DESC, id DESC) AS pos
+    FROM runs
+    WHERE (:until_id IS NULL OR id <= :until_id)
+      AND (:until_ts IS NULL OR timestamp_utc <= :until_ts)
+)
+WHERE pos = 1
+ORDER BY weighted_final DESC, team
+"""
+
+# Best-ever run per team (ties on weighted_final go to the earliest run).
+_BEST_SQL = """
+SELECT team, pipeline_id, timestamp_utc, weighted_final FROM (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY team ORDER BY weighted_final DESC, timestamp_utc) AS pos
+    FROM runs
+)
+WHERE pos = 1
+ORDER BY weighted_final DESC, team
+"""
+
+
+def _parse_ts(ts: str | None) -> datetime | None:
+    return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ") if ts else None
+
+
+def normalize_ts(value: str) -> str:
+    """
+    Parse an ISO 8601 timestamp (naive values are taken as UTC) into the stored
+    "%Y-%m-%dT%H:%M:%SZ" form. Raises ValueError on anything else, e.g. "2026-1-5".
+    """
+    try:
+        ts = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid timestamp '{value}', expected ISO 8601 such as 2025-11-08T18:00:00Z") from None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class LeaderboardHistory:
+    """
+    SQLite store of every scored run, indexed on (team, timestamp_utc).
+
+    Runs are keyed by (team, run_key), where run_key is the run directory name under
+    leaderboard/runs/<team>/, so re-importing the same runs is a no-op.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> LeaderboardHistory:
+        return self
+
+    def __exit__(self, *exc: any) -> None:
+        self.close()
+
+    # -------- Writes --------
+    def record(self, team: str, run_key: str, score_report: dict[str, any], metadata: dict[str, any]) -> bool:
+        """Record one run. Returns False if (team, run_key) was already recorded."""
+        ts = metadata.get("timestamp_utc")
+        _parse_ts(ts)  # reject malformed timestamps
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO runs (team, run_key, pipeline_id, timestamp_utc, weighted_final, score_report, "
+                "metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    team,
+                    str(run_key),
+                    metadata.get("pipeline_id"),
+                    ts,
+                    score_report["combined"]["weighted_final"],
+                    dumps(score_report),
+                    dumps(metadata),
+                ),
+            )
+        return cur.rowcount == 1
+
+    def import_runs(self, runs_dir: Path) -> int:
+        """
+        Record run directories (leaderboard/runs/<team>/<run_key>/) not seen before.
+        Only team directories modified since the last import are listed, and only new run
+        directories have their JSON read. Returns the number of runs added.
+        """
+        known = set(self.conn.execute("SELECT team, run_key FROM runs"))
+        imported = dict(self.conn.execute("SELECT team, mtime_ns FROM imported_teams"))
+        settled_before = time.time_ns() - _SETTLE_NS
+        new_runs = []
+        scanned: list[tuple[str, int]] = []
+        for team_dir in Path(runs_dir).glob("*"):
+            team = team_dir.name
+            if not team_dir.is_dir():
+                continue
+            mtime_ns = team_dir.stat().st_mtime_ns
+            if imported.get(team) == mtime_ns:
+                continue
+            complete = True
+            for run_dir in team_dir.iterdir():
+                run_key = run_dir.name
+                if (team, run_key) in known or not run_dir.is_dir():
+                    continue
+                sr = run_dir / "score_report.json"
+                md = run_dir / "metadata.json"
+                if not (sr.exists() and md.exists()):
+                    complete = False  # still being written: look again next time
+                    continue
+                try:
+                    meta = load(md)
+                    ts = _parse_ts(meta.get("timestamp_utc")) or datetime.min
+                    new_runs.append((ts, team, run_key, load(sr), meta))
+                except Exception as e:
+                    complete = False
+                    logger.warning(f"skipping run {run_dir}: {e}")
+            if complete and mtime_ns < settled_before:
+                scanned.append((team, mtime_ns))
+
+        # record in time order so run ids (and the feed) follow submission order
+        new_runs.sort(key=lambda x: (x[0], x[1], x[2]))
+        added = 0
+        for _, team, run_key, score, meta in new_runs:
+            try:
+                added += self.record(team, run_key, score, meta)
+            except Exception as e:
+                logger.warning(f"skipping run {team}/{run_key}: {e}")
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO imported_teams (team, mtime_ns) VALUES (?, ?)", scanned)
+        if added:
+            logger.info(f"recorded {added} new runs in {self.path}")
+        return added
+
+    # -------- Queries --------
+    def last_id(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM runs").fetchone()[0]
+
+    def latest_per_team(self, until_id: int | None = None, until_ts: str | None = None) -> list[tuple]:
+        """(id, team, weighted_final, score_report, metadata) of each team's latest run, best first."""
+        rows = self.conn.execute(_LATEST_SQL, {"until_id": until_id, "until_ts": until_ts}).fetchall()
+        return [(i, team, final, loads(score), loads(meta)) for i, team, final, score, meta in rows]
+
+    def standings(self, until_id: int | None = None, until_ts: str | None = None) -> dict[str, int]:
+        """team -> 1-based rank on the latest-run leaderboard as of `until_id`/`until_ts`."""
+        rows = self.conn.execute(_LATEST_SQL, {"until_id": until_id, "until_ts": until_ts}).fetchall()
+        return {row[1]: rank for rank, row in enumerate(rows, start=1)}
+
+    def best_per_team(self) -> list[dict[str, any]]:
+        """Best-ever weighted_final per team, best first."""
+        rows = self.conn.execute(_BEST_SQL).fetchall()
+        keys = ("team", "pipeline_id", "timestamp_utc", "weighted_final")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def trajectory(self, team: str) -> list[dict[str, any]]:
+        """Every run of `team` in time order."""
+        rows = self.conn.execute(
+            "SELECT pipeline_id, timestamp_utc, weighted_final FROM runs WHERE team = ? ORDER BY timestamp_utc, id",
+            (team,),
+        ).fetchall()
+        keys = ("pipeline_id", "timestamp_utc", "weighted_final")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def rank_changes(self, since_ts: str | None = None, since_id: int | None = None) -> list[dict[str, any]]:
+        """
+        Teams whose rank differs between the standings as of `since_ts` (any ISO 8601 timestamp,
+        see `normalize_ts`) or run id `since_id`, and now. New teams have previous_rank None.
+        """
+        if since_ts is not None:
+            since_ts = normalize_ts(since_ts)
+        before = self.standings(until_id=since_id, until_ts=since_ts)
+        now = self.standings()
+        changes = []
+        for team, rank in now.items():
+            previous = before.get(team)
+            if previous != rank:
+                changes.append({"team": team, "rank": rank, "previous_rank": previous})
+        return changes
+
+    def feed(self, cursor: int = 0) -> dict[str, any]:
+        """
+        Incremental change feed: the runs recorded after `cursor` and the rank changes they caused.
+        Pass the returned cursor to the next call.
+        """
+        rows = self.conn.execute(
+            "SELECT id, team, pipeline_id, timestamp_utc, weighted_final FROM runs WHERE id > ? ORDER BY id",
+            (cursor,),
+        ).fetchall()
+        keys = ("id", "team", "pipeline_id", "timestamp_utc", "weighted_final")
+        return {
+            "cursor": rows[-1][0] if rows else cursor,
+            "runs": [dict(zip(keys, row)) for row in rows],
+            "rank_changes": self.rank_changes(since_id=cursor) if rows else [],
+        }
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable
+
+from .cache import file_sha256
+from .serialization import dumps, loads
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+QUEUE_DB = "queue.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    team           TEXT NOT NULL,
+    digest         TEXT NOT NULL,
+    submission     TEXT NOT NULL,
+    state          TEXT NOT NULL,
+    enqueued_at    REAL NOT NULL,
+    started_at     REAL,
+    finished_at    REAL,
+    superseded_by  INTEGER,
+    duplicate_of   INTEGER,
+    inputs         TEXT,
+    result         TEXT,
+    error          TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, enqueued_at);
+CREATE INDEX IF NOT EXISTS jobs_team ON jobs (team, state);
+"""
+
+# Next job: the queued job of the team served least recently (never-served teams first), skipping
+# teams that already have a job running and content that is being scored right now (it will be
+# reusable once that job is done).
+_NEXT_SQL = """
+SELECT j.id FROM jobs j
+LEFT JOIN (SELECT team, MAX(started_at) AS last_start FROM jobs GROUP BY team) s ON s.team = j.team
+WHERE j.state = 'queued'
+  AND j.team NOT IN (SELECT team FROM jobs WHERE state = 'running')
+  AND j.digest NOT IN (SELECT digest FROM jobs WHERE state = 'running')
+ORDER BY s.last_start IS NOT NULL, s.last_start, j.enqueued_at, j.id
+LIMIT 1
+"""
+
+_JOB_FIELDS = (
+    "id",
+    "team",
+    "digest",
+    "submission",
+    "state",
+    "enqueued_at",
+    "started_at",
+    "finished_at",
+    "duplicate_of",
+    "inputs",
+)
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+class SubmissionQueue:
+    """
+    SQLite-backed scoring queue under `root` (queue.sqlite plus content-addressed submission copies).
+
+    - A new submission from a team supersedes that team's jobs still waiting in the queue.
+    - Enqueuing content identical to a team's waiting or running job is a no-op; a job whose content
+      was already scored against the same scoring inputs (catalog, queries, labels; see
+      `drain(inputs=...)`), for any team since scoring does not depend on the team, reuses that
+      result instead of being scored again. Results are still handed out, and published, per job.
+    - Jobs are handed out least-recently-served team first, at most one running job per team.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        (self.root / "submissions").mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.root / QUEUE_DB, isolation_level=None)
+        self.conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        if "inputs" not in columns:
+            # queues created before jobs recorded their scoring inputs; their results are never reused
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN inputs TEXT")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> SubmissionQueue:
+        return self
+
+    def __exit__(self, *exc: any) -> None:
+        self.close()
+
+    def _job(self, job_id: int) -> dict[str, any]:
+        row = self.conn.execute(f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(_JOB_FIELDS, row))
+
+    # -------- Producers --------
+    def enqueue(self, team: str, submission_path: str | Path) -> int:
+        """Queue a snapshot of `submission_path` for `team`. Returns the (possibly existing) job id."""
+        digest = file_sha256(submission_path)
+        snapshot = self.root / "submissions" / f"{digest}.json"
+        if not snapshot.exists():
+            shutil.copyfile(submission_path, snapshot)
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self.conn.execute(
+                "SELECT id FROM jobs WHERE team = ? AND digest = ? AND state IN ('queued', 'running') ORDER BY id DESC",
+                (team, digest),
+            ).fetchone()
+            if existing is not None:
+                self.conn.execute("COMMIT")
+                logger.info(f"submission for {team} is already queued as job {existing[0]}")
+                return existing[0]
+            job_id = self.conn.execute(
+                "INSERT INTO jobs (team, digest, submission, state, enqueued_at) VALUES (?, ?, ?, 'queued', ?)",
+                (team, digest, str(snapshot), time.time()),
+            ).lastrowid
+            superseded = self.conn.execute(
+                "UPDATE jobs SET state = 'superseded', superseded_by = ?, finished_at = ? "
+                "WHERE team = ? AND state = 'queued' AND id != ?",
+                (job_id, time.time(), team, job_id),
+            ).rowcount
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if superseded:
+            logger.info(f"job {job_id} for {team} supersedes {superseded} queued job(s)")
+        return job_id
+
+    # -------- Scheduler --------
+    def claim(self, inputs: str | None = None) -> dict[str, any] | None:
+        """
+        Mark the next job running and return it, or None if nothing is runnable. `inputs` is a digest
+        of everything besides the submission that the score depends on, recorded on the job. A job
+        whose content was already scored against the same `inputs`, by any team, is completed from
+        that result right away and returned with state 'done' and `duplicate_of` set. Without
+        `inputs`, results are never reused.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(_NEXT_SQL).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            job = self._job(row[0])
+            now = time.time()
+            done = None
+            if inputs is not None:
+                done = self.conn.execute(
+                    "SELECT id, result FROM jobs WHERE digest = ? AND inputs = ? AND state = 'done' ORDER BY id DESC",
+                    (job["digest"], inputs),
+                ).fetchone()
+            if done is not None:
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'done', started_at = ?, finished_at = ?, duplicate_of = ?, inputs = ?, "
+                    "result = ? WHERE id = ?",
+                    (now, now, done[0], inputs, done[1], job["id"]),
+                )
+                logger.info(f"job {job['id']} for {job['team']} has the content of job {done[0]}, reusing its result")
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'running', started_at = ?, inputs = ? WHERE id = ?",
+                    (now, inputs, job["id"]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self._job(job["id"])
+
+    def complete(self, job_id: int, result: any = None, error: str | None = None) -> None:
+        self.conn.execute(
+            "UPDATE jobs SET state = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+            ("failed" if error is not None else "done", time.time(), dumps(result), error, job_id),
+        )
+
+    def requeue_running(self) -> int:
+        """Put jobs left 'running' by a scheduler that died back in the queue."""
+        return self.conn.execute("UPDATE jobs SET state = 'queued', started_at = NULL WHERE state = 'running'").rowcount
+
+    def drain(
+        self,
+        handler: Callable[[dict[str, any]], any],
+        max_workers: int = 2,
+        on_result: Callable[[dict[str, any], any], None] | None = None,
+        inputs: str | None = None,
+    ) -> int:
+        """
+        Run queued jobs with `handler(job)` on a pool of `max_workers` threads until the queue is
+        empty. Jobs enqueued meanwhile are picked up too. `on_result(job, result)` runs on the calling
+        thread, one job at a time, after each successful job (including jobs that reused an earlier
+        result). `inputs` digests what `handler` scores against besides the submission (see `claim`);
+        only results scored against the same `inputs` are reused. Returns the number of jobs handed
+        to `handler`.
+        """
+        requeued = self.requeue_running()
+        if requeued:
+            logger.warning(f"requeued {requeued} job(s) left running by a previous scheduler")
+        ran = 0
+        running: dict[Future, dict[str, any]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tamu25-queue") as pool:
+            while True:
+                while len(running) < max_workers and (job := self.claim(inputs)) is not None:
+                    if job["state"] == "done":
+                        if on_result is not None:
+                            on_result(job, self.result(job["id"]))
+                        continue
+                    logger.info(f"starting job {job['id']} for {job['team']}")
+                    running[pool.submit(handler, job)] = job
+                if not running:
+                    return ran
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job = running.pop(future)
+                    ran += 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"job {job['id']} for {job['team']} failed: {e}")
+                        self.complete(job["id"], error=str(e))
+                        continue
+                    self.complete(job["id"], result)
+                    if on_result is not None:
+                        on_result(job, result)
+
+    # -------- Introspection --------
+    def jobs(self, state: str | None = None) -> list[dict[str, any]]:
+        rows = self.conn.execute(
+            f"SELECT {', '.join(_JOB_FIELDS)} FROM jobs WHERE (:state IS NULL OR state = :state) ORDER BY id",
+            {"state": state},
+        ).fetchall()
+        return [dict(zip(_JOB_FIELDS, row)) for row in rows]
+
+    def result(self, job_id: int) -> any:
+        row = self.conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return loads(row[0]) if row is not None and row[0] is not None else None
+
+    def stats(self) -> dict[str, any]:
+        """Queue depth, per-state counts and wait/run latency percentiles (seconds)."""
+        counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        now = time.time()
+        oldest = self.conn.execute("SELECT MIN(enqueued_at) FROM jobs WHERE state = 'queued'").fetchone()[0]
+        waits = [
+            r[0] for r in self.conn.execute("SELECT started_at - enqueued_at FROM jobs WHERE started_at IS NOT NULL")
+        ]
+        runs = [
+            r[0]
+            for r in self.conn.execute(
+                "SELECT finished_at - started_at FROM jobs WHERE state IN ('done', 'failed') AND duplicate_of IS NULL"
+            )
+        ]
+        return {
+            "depth": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "states": counts,
+            "oldest_queued_age": round(now - oldest, 3) if oldest is not None else None,
+            "wait_p50": _percentile(waits, 0.5),
+            "wait_p95": _percentile(waits, 0.95),
+            "run_p50": _percentile(runs, 0.5),
+            "run_p95": _percentile(runs, 0.95),
+        }
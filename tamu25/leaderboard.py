@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import pytz
+
+from .history import LeaderboardHistory
+from .model import METRIC_NAMES
+from .serialization import dump, dumps
+
+HISTORY_DB = "history.sqlite"
+FEED_FILE = "feed.jsonl"
+_COLUMNS = (
+    "Rank",
+    "Team",
+    "Final",
+    *(f"Real {name.replace('composite', 'Composite')}" for name in METRIC_NAMES),
+    *(f"Synth {name.replace('composite', 'Composite')}" for name in METRIC_NAMES),
+    "Pipeline",
+    "Timestamp (CST)",
+)
+
+
+def utc_to_cst(utc_timestamp):
+    """Convert UTC timestamp string to CST timezone"""
+    if not utc_timestamp:
+        return None
+    try:
+        utc_dt = datetime.strptime(utc_timestamp, "%Y-%m-%dT%H:%M:%SZ")
+        utc_dt = pytz.utc.localize(utc_dt)
+        cst_tz = pytz.timezone("America/Chicago")
+        cst_dt = utc_dt.astimezone(cst_tz)
+        return cst_dt.strftime("%Y-%m-%d %H:%M:%S CST")
+    except Exception:
+        return utc_timestamp
+
+
+def _leaderboard_row(team, score, meta):
+    """Flatten one score report + metadata into a leaderboard row (real metrics are None when absent)."""
+    real_scores = score.get("real") or {}
+    synth_scores = score["synthetic"]
+    row = {"team": team, "weighted_final": score["combined"]["weighted_final"]}
+    for name in METRIC_NAMES:
+        row[f"real_{name}"] = real_scores.get(name)
+    for name in METRIC_NAMES:
+        row[f"synth_{name}"] = synth_scores[name]
+    row.update(
+        {
+            "queries_scored_real": real_scores.get("queries_scored"),
+            "queries_scored_synth": synth_scores["queries_scored"],
+            "pipeline_id": meta.get("pipeline_id"),
+            "commit_sha": meta.get("commit_sha"),
+            "timestamp_utc": meta.get("timestamp_utc"),
+            "timestamp_cst": utc_to_cst(meta.get("timestamp_utc")),
+        }
+    )
+    segments = {
+        split: score[split]["segments"] for split in ("real", "synthetic") if "segments" in (score.get(split) or {})
+    }
+    if segments:
+        row["segments"] = segments
+    return row
+
+
+def to_markdown(rows):
+    lines = []
+    lines.append("# :trophy: TAMU-25 Leaderboard\n")
+    lines.append("| " + " | ".join(_COLUMNS) + " |")
+    lines.append("|---:|---|---:|" + "---:|" * 2 * len(METRIC_NAMES) + "---|---|")
+    for i, r in enumerate(rows, start=1):
+        # real scores are N/A when only synthetic labels were scored
+        real = [f"{r[f'real_{name}']:.3f}" if r[f"real_{name}"] is not None else "N/A" for name in METRIC_NAMES]
+        synth = [f"{r[f'synth_{name}']:.3f}" for name in METRIC_NAMES]
+        timestamp_display = r["timestamp_cst"] or r["timestamp_utc"] or "N/A"
+        cells = [
+            str(i),
+            r["team"],
+            f"{r['weighted_final']:.3f}",
+            *real,
+            *synth,
+            str(r["pipeline_id"]),
+            timestamp_display,
+        ]
+        lines.append("| " + " | ".join(cells) + " |")
+    lines += _segment_tables(rows)
+    return "\n".join(lines) + "\n"
+
+
+def _segment_tables(rows):
+    """Composite per segment, one table per (split, dimension) found in the rows' score reports."""
+    tables = {}
+    for r in rows:
+        for split, dims in r.get("segments", {}).items():
+            for dim, segments in dims.items():
+                columns = tables.setdefault((split, dim), [])
+                columns += [name for name in segments if name not in columns]
+    if not tables:
+        return []
+    lines = ["", "## Composite by segment"]
+    for (split, dim), columns in tables.items():
+        lines.append(f"\n### {split.capitalize()} queries by {dim}\n")
+        lines.append("| Rank | Team | " + " | ".join(columns) + " |")
+        lines.append("|---:|---|" + "---:|" * len(columns))
+        for i, r in enumerate(rows, start=1):
+            segments = r.get("segments", {}).get(split, {}).get(dim, {})
+            cells = [f"{segments[c]['composite']:.3f}" if c in segments else "N/A" for c in columns]
+            lines.append(f"| {i} | {r['team']} | " + " | ".join(cells) + " |")
+    return lines
+
+
+def build_leaderboard(leaderboard_dir: Path) -> list[dict[str, any]]:
+    """
+    Aggregate leaderboard_dir/runs into leaderboard.json and leaderboard.md. Returns the ranked rows.
+
+    Runs are recorded incrementally in leaderboard_dir/history.sqlite (only run directories not seen
+    before are read), and the runs and rank changes added by this call are appended to feed.jsonl.
+    """
+    leaderboard_dir = Path(leaderboard_dir)
+    runs_dir = leaderboard_dir / "runs"
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    with LeaderboardHistory(leaderboard_dir / HISTORY_DB) as history:
+        cursor = history.last_id()
+        history.import_runs(runs_dir)
+        latest = history.latest_per_team()
+        changes = history.feed(cursor)
+    rows = [_leaderboard_row(team, score, meta) for _, team, _, score, meta in latest]
+    dump({"rows": rows}, leaderboard_dir / "leaderboard.json")
+    (leaderboard_dir / "leaderboard.md").write_text(to_markdown(rows), encoding="utf-8")
+    if changes["runs"]:
+        with open(leaderboard_dir / FEED_FILE, "a", encoding="utf-8") as f:
+            f.write(dumps(changes) + "\n")
+    return rows
+
+
+def write_run(
+    leaderboard_dir: Path,
+    team: str,
+    run_id: str,
+    score_report: dict[str, any],
+    metadata: dict[str, any],
+) -> Path:
+    """Persist one scored run as leaderboard_dir/runs/<team>/<run_id>/{score_report.json, metadata.json}."""
+    run_dir = Path(leaderboard_dir) / "runs" / team / str(run_id)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    dump(score_report, run_dir / "score_report.json")
+    dump(metadata, run_dir / "metadata.json")
+    return run_dir
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .compression import read_input
+from .golden import load_labels
+from .model import GoldenSet, IdIndex
+from .segments import query_words
+from .serialization import dump, load
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Bump whenever the manifest layout changes; older manifests are rejected and must be rebuilt.
+MANIFEST_VERSION = 2
+
+
+class StaleManifestError(ValueError):
+    """A manifest no longer matches the query or label files it describes."""
+
+
+def manifest_path(split: str, data_dir: str | Path = "data") -> Path:
+    return Path(data_dir) / f"manifest_{split}.json"
+
+
+def content_sha256(path: str | Path) -> str:
+    """sha256 of the decompressed content, so labels.json and labels.json.gz hash alike."""
+    return hashlib.sha256(read_input(path)).hexdigest()
+
+
+class Manifest:
+    """
+    Precomputed description of one split (train/test): the sorted query ids with each query's word
+    count, and for every label set (synthetic/real) the number of labels and relevant products per
+    query, aligned to the query ids. Every source file is recorded by absolute path with the sha256
+    of its decompressed content, so a manifest that no longer matches its inputs is refused
+    (StaleManifestError) without re-parsing them.
+    """
+
+    def __init__(
+        self,
+        split: str,
+        queries: IdIndex,
+        words: Sequence[int],
+        sources: list[dict[str, str]],
+        labels: dict[str, dict[str, any]],
+    ) -> None:
+        self.split = split
+        self.queries = queries
+        self.words = words
+        self.sources = sources
+        self.labels = labels
+
+    @classmethod
+    def load(cls, path: str | Path) -> Manifest:
+        data = load(path)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"unsupported manifest version {data.get('version')} in {path}, rebuild it")
+        queries = data["queries"]
+        return cls(data["split"], IdIndex(queries["ids"]), queries["words"], queries["sources"], data["labels"])
+
+    def to_dict(self) -> dict[str, any]:
+        return {
+            "version": MANIFEST_VERSION,
+            "split": self.split,
+            "queries": {"ids": self.queries.ids, "words": list(self.words), "sources": self.sources},
+            "labels": self.labels,
+        }
+
+    def __contains__(self, query_id: str) -> bool:
+        return query_id in self.queries
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def query_words(self) -> dict[str, int]:
+        return dict(zip(self.queries.ids, self.words))
+
+    def label_counts(self, kind: str, query_id: str) -> tuple[int, int]:
+        """(labels, relevant products) of `query_id` in the `kind` label set; (0, 0) if it has none."""
+        i = self.queries.get(query_id)
+        if i < 0 or kind not in self.labels:
+            return 0, 0
+        entry = self.labels[kind]
+        return entry["label_counts"][i], entry["relevant_counts"][i]
+
+    def _labels_of(self, kind: str) -> dict[str, any]:
+        entry = self.labels.get(kind)
+        if entry is None:
+            raise StaleManifestError(f"the {self.split} manifest has no {kind} labels, rebuild it with them")
+        return entry
+
+    def check_labels(self, kind: str, labels_path: str | Path) -> None:
+        """Raise StaleManifestError unless `labels_path` is the `kind` label file the manifest was built from."""
+        if content_sha256(labels_path) != self._labels_of(kind)["sha256"]:
+            raise StaleManifestError(
+                f"{labels_path} does not match the {kind} labels of the {self.split} manifest, rebuild it"
+            )
+
+    def check_sources(self) -> None:
+        """
+        Raise StaleManifestError if a query file the manifest was built from has changed. The manifest
+        stands in for query files that are no longer present; each one is logged as unchecked.
+        """
+        for source in self.sources:
+            path = Path(source["path"])
+            if not path.is_file():
+                logger.warning(f"{path} is missing, so the {self.split} manifest cannot be checked against it")
+            elif content_sha256(path) != source["sha256"]:
+                raise StaleManifestError(f"{path} changed since the {self.split} manifest was built, rebuild it")
+
+
+def _label_entry(labels_path: Path, queries: IdIndex) -> dict[str, any]:
+    rows, _ = load_labels(labels_path)
+    golden = GoldenSet.from_rows(rows)
+    label_counts = [0] * len(queries)
+    relevant_counts = [0] * len(queries)
+    unlisted = 0
+    for qid in golden.queries.ids:
+        i = queries.get(qid)
+        if i < 0:
+            unlisted += 1
+            continue
+        q = golden.queries.get(qid)
+        label_counts[i] = golden.offsets[q + 1] - golden.offsets[q]
+        relevant_counts[i] = golden.relevant_count(qid)
+    if unlisted:
+        logger.warning(f"{labels_path} labels {unlisted} queries that are not in the query files")
+    return {
+        "path": str(labels_path.resolve()),
+        "sha256": content_sha256(labels_path),
+        "label_counts": label_counts,
+        "relevant_counts": relevant_counts,
+        "unlisted_queries": unlisted,
+    }
+
+
+def build_manifest(
+    split: str,
+    queries_paths: Iterable[str | Path],
+    labels_paths: dict[str, str | Path] | None = None,
+    out: str | Path | None = None,
+) -> Manifest:
+    """
+    Build the manifest of `split` from its queries_*.json files and (optionally) its label files,
+    keyed by kind ("synthetic"/"real"), and write it to `out` (default data/manifest_<split>.json).
+    """
+    words: dict[str, int] = {}
+    sources = []
+    for path in queries_paths:
+        words.update(query_words(load(path)))
+        sources.append({"path": str(Path(path).resolve()), "sha256": content_sha256(path)})
+    ids = sorted(words)
+    queries = IdIndex(ids)
+    labels = {kind: _label_entry(Path(path), queries) for kind, path in (labels_paths or {}).items()}
+
+    manifest = Manifest(split, queries, [words[qid] for qid in ids], sources, labels)
+    out = Path(out) if out is not None else manifest_path(split)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    dump(manifest.to_dict(), out, indent=None)
+    logger.info(f"wrote {split} manifest ({len(ids)} queries, labels: {sorted(labels) or 'none'}) to {out}")
+    return manifest
@@ -14,10 +14,19 @@ def dcg_at_k(rels: Sequence[int], k: int) -> float:
     return dcg
 
 
-def ndcg_at_k(rels: Sequence[int], k: int) -> float:
+def ideal_dcg_at_k(judged_rels: Sequence[int], k: int) -> float:
+    """DCG@k of the best possible ranking of every judged relevance for a query."""
+    return dcg_at_k(sorted(judged_rels, reverse=True), k)
+
+
+def ndcg_at_k(rels: Sequence[int], k: int, idcg: float | None = None) -> float:
+    """
+    nDCG@k of `rels`. `idcg` is the query's ideal DCG@k from the golden set; without it the ideal
+    is taken from the submitted relevances themselves.
+    """
     dcg = dcg_at_k(rels, k)
-    ideal = sorted(rels, reverse=True)
-    idcg = dcg_at_k(ideal, k)
+    if idcg is None:
+        idcg = ideal_dcg_at_k(rels, k)
     if idcg == 0:
         return 0.0
     return dcg / idcg
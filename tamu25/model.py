@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator
+
+from .metrics import ideal_dcg_at_k
+from .serialization import LabelRow, SubmissionRow
+
+METRIC_NAMES = ("nDCG@10", "AP@20", "P@10", "R@30", "composite")
+# nDCG cutoffs the scorer uses; ideal DCG is precomputed for each of them
+DCG_CUTOFFS = (10,)
+
+
+class IdIndex:
+    """Interns string ids to dense integer indices (in insertion order)."""
+
+    __slots__ = ("ids", "_index")
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        self.ids: list[str] = []
+        self._index: dict[str, int] = {}
+        for key in ids:
+            self.add(key)
+
+    def add(self, key: str) -> int:
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self.ids)
+            self.ids.append(key)
+        return idx
+
+    def get(self, key: str, default: int = -1) -> int:
+        return self._index.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def group_by_index(keys: array, n_keys: int, *columns: array) -> tuple[array, list[array]]:
+    """
+    Counting sort of parallel `columns` by the dense key index in `keys` (a query, a term, ...).
+    Returns CSR offsets, where key k's rows are `[offsets[k]:offsets[k + 1]]`, and the grouped
+    columns. Stable, so input order is kept within a key.
+    """
+    offsets = array("q", bytes(8 * (n_keys + 1)))
+    for q in keys:
+        offsets[q + 1] += 1
+    for i in range(n_keys):
+        offsets[i + 1] += offsets[i]
+    cursor = array("q", offsets[:-1])
+    grouped = [array(col.typecode, bytes(col.itemsize * len(col))) for col in columns]
+    for i, q in enumerate(keys):
+        pos = cursor[q]
+        cursor[q] = pos + 1
+        for src, dst in zip(columns, grouped):
+            dst[pos] = src[i]
+    return offsets, grouped
+
+
+class QueryView:
+    """Zero-copy view of one query's results: ranks and product indices, sorted by rank."""
+
+    __slots__ = ("query_id", "ranks", "products")
+
+    def __init__(self, query_id: str, ranks: memoryview, products: memoryview) -> None:
+        self.query_id = query_id
+        self.ranks = ranks
+        self.products = products
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+
+class Submission:
+    """
+    Submission rows as parallel int arrays (rank, product index), grouped by query and sorted by rank
+    within each query. Rows of query i live at offsets[i]:offsets[i + 1]. Queries keep the order in
+    which they first appear in the submission.
+    """
+
+    __slots__ = ("queries", "products", "offsets", "rank", "product")
+
+    def __init__(self, queries: IdIndex, products: IdIndex, offsets: array, rank: array, product: array) -> None:
+        self.queries = queries
+        self.products = products
+        self.offsets = offsets
+        self.rank = rank
+        self.product = product
+
+    @classmethod
+    def from_fields(cls, fields: Iterable[tuple[str, int, str]], products: IdIndex | None = None) -> Submission:
+        """Build from (query_id, rank, product_id) triples. Product ids are interned into `products`."""
+        queries = IdIndex()
+        products = products if products is not None else IdIndex()
+        query, rank, product = array("i"), array("i"), array("i")
+        for qid, r, pid in fields:
+            query.append(queries.add(qid))
+            rank.append(r)
+            product.append(products.add(pid))
+
+        offsets, (rank, product) = group_by_index(query, len(queries), rank, product)
+        for i in range(len(queries)):
+            start, end = offsets[i], offsets[i + 1]
+            ranked = sorted(zip(rank[start:end], product[start:end]), key=lambda x: x[0])
+            rank[start:end] = array("i", [r for r, _ in ranked])
+            product[start:end] = array("i", [p for _, p in ranked])
+        return cls(queries, products, offsets, rank, product)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[SubmissionRow], products: IdIndex | None = None) -> Submission:
+        return cls.from_fields(((row.query_id, row.rank, row.product_id) for row in rows), products)
+
+    def __len__(self) -> int:
+        return len(self.rank)
+
+    def __iter__(self) -> Iterator[QueryView]:
+        for i in range(len(self.queries)):
+            yield self.view(i)
+
+    def view(self, i: int) -> QueryView:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return QueryView(self.queries.ids[i], memoryview(self.rank)[start:end], memoryview(self.product)[start:end])
+
+
+class GoldenSet:
+    """
+    Relevance labels as parallel int arrays (product index, relevance) grouped by query.
+    Product ids are interned into the same IdIndex as the submission being scored.
+    `ideal_dcg[k][i]` is query i's ideal DCG@k over all of its judged labels.
+    """
+
+    __slots__ = ("queries", "products", "offsets", "product", "relevance", "relevant_counts", "ideal_dcg", "_maps")
+
+    def __init__(
+        self,
+        queries: IdIndex,
+        products: IdIndex,
+        offsets: array,
+        product: array,
+        relevance: array,
+        relevant_counts: array,
+    ) -> None:
+        self.queries = queries
+        self.products = products
+        self.offsets = offsets
+        self.product = product
+        self.relevance = relevance
+        self.relevant_counts = relevant_counts
+        self.ideal_dcg: dict[int, array] = {}
+        self._maps: dict[int, dict[int, int]] = {}
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[LabelRow],
+        products: IdIndex | None = None,
+        ideal_dcg: dict[int, dict[str, float]] | None = None,
+    ) -> GoldenSet:
+        """
+        `ideal_dcg` optionally supplies precomputed {k: {query_id: ideal DCG@k}} tables; cutoffs
+        it does not cover are computed on first use.
+        """
+        queries = IdIndex()
+        products = products if products is not None else IdIndex()
+        query, product, relevance = array("i"), array("i"), array("h")
+        for row in rows:
+            query.append(queries.add(row.query_id))
+            product.append(products.add(row.product_id))
+            relevance.append(row.relevance)
+
+        offsets, (product, relevance) = group_by_index(query, len(queries), product, relevance)
+        relevant_counts = array("i", bytes(4 * len(queries)))
+        for i in range(len(queries)):
+            relevant_counts[i] = sum(1 for rel in relevance[offsets[i] : offsets[i + 1]] if rel >= 1)
+        golden = cls(queries, products, offsets, product, relevance, relevant_counts)
+        for k, table in (ideal_dcg or {}).items():
+            if all(qid in table for qid in queries.ids):
+                golden.ideal_dcg[k] = array("d", [table[qid] for qid in queries.ids])
+        return golden
+
+    def __len__(self) -> int:
+        return len(self.product)
+
+    def relevance_map(self, query_id: str) -> dict[int, int]:
+        """product index -> relevance for one query (empty if the query is unlabeled)."""
+        i = self.queries.get(query_id)
+        if i < 0:
+            return {}
+        lookup = self._maps.get(i)
+        if lookup is None:
+            start, end = self.offsets[i], self.offsets[i + 1]
+            lookup = self._maps[i] = dict(zip(self.product[start:end], self.relevance[start:end]))
+        return lookup
+
+    def relevant_count(self, query_id: str) -> int:
+        i = self.queries.get(query_id)
+        return self.relevant_counts[i] if i >= 0 else 0
+
+    def compute_ideal_dcg(self, k: int) -> array:
+        """Ideal DCG@k for every query, from the full label distribution (one sort per query)."""
+        table = self.ideal_dcg.get(k)
+        if table is None:
+            table = array("d", [0.0] * len(self.queries))
+            for i in range(len(self.queries)):
+                table[i] = ideal_dcg_at_k(self.relevance[self.offsets[i] : self.offsets[i + 1]], k)
+            self.ideal_dcg[k] = table
+        return table
+
+    def ideal_dcg_at(self, query_id: str, k: int) -> float:
+        i = self.queries.get(query_id)
+        return self.compute_ideal_dcg(k)[i] if i >= 0 else 0.0
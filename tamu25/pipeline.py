@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Collection
+
+from .cache import cache_key
+from .evaluate import _accumulate, _combine, _new_accumulator, _score_query, _summarize
+from .golden import ideal_dcg_path, load_labels
+from .leaderboard import build_leaderboard, write_run
+from .manifest import Manifest, StaleManifestError
+from .model import GoldenSet, IdIndex, QueryView, Submission
+from .segments import Segmentation, query_words
+from .serialization import dumps
+from .validate import (
+    VALIDATOR_VERSION,
+    _check_coverage,
+    _check_query,
+    _extract_products,
+    _finalize,
+    _load_json,
+    _load_submission,
+    _new_report,
+    _required_queries,
+    _row_fields,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker put on the query queue once validation has emitted every query.
+_DONE = object()
+# Queries checked per worker-thread hop, so the event loop stays free while a submission is checked.
+_CHECK_BATCH = 256
+
+
+async def _fetch_labels(
+    storage: any, blob_name: str, download_dir: Path, manifest: Manifest | None = None, kind: str | None = None
+) -> tuple[list, dict | None]:
+    """
+    Fetch a label blob plus its ideal DCG table (see `prepare_labels`), if the bucket has one. With a
+    `manifest`, the fetched file must be its `kind` label file (else StaleManifestError).
+    """
+    path = download_dir / Path(blob_name).name
+    await asyncio.gather(
+        asyncio.to_thread(storage.fetch, blob_name, path),
+        asyncio.to_thread(_fetch_optional, storage, ideal_dcg_path(blob_name).as_posix(), ideal_dcg_path(path)),
+    )
+    if manifest is not None:
+        await asyncio.to_thread(manifest.check_labels, kind, path)
+    return await asyncio.to_thread(load_labels, path)
+
+
+def _fetch_optional(storage: any, blob_name: str, destination: Path) -> None:
+    try:
+        if storage.exists(blob_name):
+            storage.fetch(blob_name, destination)
+    except Exception as e:
+        logger.warning(f"could not fetch {blob_name}, continuing without it: {e}")
+
+
+async def _write_json(path: Path, payload: dict[str, any]) -> None:
+    text = dumps(payload, indent=2)
+    await asyncio.to_thread(path.write_text, text, encoding="utf-8")
+
+
+async def _validate_stream(
+    submission_path: Path,
+    products_path: Path,
+    queries_real_path: Path | None,
+    queries_synth_path: Path | None,
+    team: str,
+    queue: asyncio.Queue,
+    out_path: Path,
+    manifest: Manifest | None = None,
+) -> dict[str, any]:
+    """
+    Validate the submission, streaming it onto `queue`: first the product IdIndex, then a QueryView
+    for each query as soon as it passes its per-query checks, so scoring can start before
+    validation finishes.
+    """
+    report = await _check_submission(
+        submission_path, products_path, queries_real_path, queries_synth_path, team, queue, manifest
+    )
+    await queue.put(_DONE)
+    await _write_json(out_path, report)
+    return report
+
+
+async def _check_submission(
+    submission_path: Path,
+    products_path: Path,
+    queries_real_path: Path | None,
+    queries_synth_path: Path | None,
+    team: str,
+    queue: asyncio.Queue,
+    manifest: Manifest | None = None,
+) -> dict[str, any]:
+    report = _new_report(team)
+    if not submission_path.exists():
+        logger.error(f"submission file not found: {submission_path}")
+        report["errors"].append(f"submission file not found: {submission_path}")
+        return report
+
+    if manifest is not None:
+        products_raw, submission = await asyncio.gather(
+            asyncio.to_thread(_load_json, products_path),
+            asyncio.to_thread(_load_submission, submission_path),
+        )
+        required_queries, words = manifest.queries.ids, manifest.query_words()
+    else:
+        products_raw, queries_real, queries_synth, submission = await asyncio.gather(
+            asyncio.to_thread(_load_json, products_path),
+            asyncio.to_thread(_load_json, queries_real_path) if queries_real_path is not None else asyncio.sleep(0, []),
+            asyncio.to_thread(_load_json, queries_synth_path),
+            asyncio.to_thread(_load_submission, submission_path),
+        )
+        required_queries = _required_queries(queries_real, queries_synth)
+        words = query_words([*queries_real, *queries_synth])
+    if not isinstance(submission, list):
+        report["errors"].append("submission must be a JSON array of objects")
+        return report
+
+    products, grouped = await asyncio.to_thread(_group_submission, products_raw, submission, required_queries, report)
+    catalog_size = len(products)
+
+    # scoring header: the product index and query word counts (for the query-length segments)
+    await queue.put((products, words))
+    duplicate_pairs: list[dict[str, str]] = []
+    views = list(grouped)
+    for start in range(0, len(views), _CHECK_BATCH):
+        batch = views[start : start + _CHECK_BATCH]
+        passed = await asyncio.to_thread(_check_batch, batch, products, catalog_size, report, duplicate_pairs)
+        for view in passed:
+            await queue.put(view)
+
+    qcount = len(grouped.queries)
+    report["queries_checked"] = qcount
+    report["avg_depth"] = round(len(grouped) / qcount, 2) if qcount else 0
+    return _finalize(report, duplicate_pairs)
+
+
+def _group_submission(
+    products_raw: any, submission: list[any], required_queries: Collection[str], report: dict[str, any]
+) -> tuple[IdIndex, Submission]:
+    products = IdIndex(_extract_products(products_raw))
+    grouped = Submission.from_fields(_row_fields(submission, report), products)
+    _check_coverage(required_queries, grouped.queries, report)
+    return products, grouped
+
+
+def _check_batch(
+    views: list[QueryView],
+    products: IdIndex,
+    catalog_size: int,
+    report: dict[str, any],
+    duplicate_pairs: list[dict[str, str]],
+) -> list[QueryView]:
+    """The views in `views` that pass their per-query checks."""
+    return [view for view in views if _check_query(view, products, catalog_size, report, duplicate_pairs)]
+
+
+async def _score_stream(
+    queue: asyncio.Queue,
+    label_tasks: dict[str, asyncio.Task],
+) -> dict[str, dict[str, any]]:
+    """Score queries from `queue` against every label set once its labels have been fetched."""
+    accumulators = {name: _new_accumulator() for name in label_tasks}
+    scored = 0
+    segmentations: dict[str, Segmentation] = {}
+    header = await queue.get()
+    if header is not _DONE:
+        products, words = header
+        # labels share the submission's product index so lookups are by integer id
+        golden_sets = {}
+        for name, task in label_tasks.items():
+            rows, ideal_dcg = await task
+            golden_sets[name] = GoldenSet.from_rows(rows, products, ideal_dcg)
+            segmentations[name] = Segmentation(golden_sets[name], words)
+        while (view := await queue.get()) is not _DONE:
+            for name, golden in golden_sets.items():
+                _accumulate(accumulators[name], _score_query(view.products, golden, view.query_id), view.query_id)
+            scored += 1
+    return {name: _summarize(acc, scored, segmentations.get(name)) for name, acc in accumulators.items()}
+
+
+def _run_metadata(team: str, submission_path: Path, run_id: str) -> dict[str, any]:
+    return {
+        "team": team,
+        "team_dir": str(submission_path.parent),
+        "submission_file": str(submission_path),
+        "pipeline_id": run_id,
+        "pipeline_url": os.environ.get("CI_PIPELINE_URL", ""),
+        "commit_sha": os.environ.get("CI_COMMIT_SHA", ""),
+        "mr_iid": os.environ.get("CI_MERGE_REQUEST_IID", ""),
+        "timestamp_utc": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+async def run_pipeline(
+    submission_path: str | Path,
+    products_path: str | Path,
+    queries_synth_path: str | Path | None,
+    labels_synth_blob: str,
+    team: str,
+    storage: any,
+    queries_real_path: str | Path | None = None,
+    labels_real_blob: str | None = None,
+    out_dir: str | Path = ".",
+    leaderboard_dir: str | Path | None = None,
+    run_id: str | None = None,
+    w_real: float = 0.7,
+    w_synth: float = 0.3,
+    manifest_path: str | Path | None = None,
+) -> dict[str, any]:
+    """
+    Validate, score and publish a submission in one pass.
+
+    Label downloads from `storage` start immediately and overlap validation; queries that pass
+    validation are streamed into scoring. The score is kept only if the whole submission passes,
+    in which case score_report.json, metadata.json and (if `leaderboard_dir` is set) the
+    leaderboard run and aggregate files are written concurrently.
+    With `manifest_path`, required queries and query lengths come from the split manifest instead of
+    the query files; scores are the same as with them. A manifest that no longer matches the query
+    files or the fetched labels is refused with StaleManifestError.
+    """
+    if queries_synth_path is None and manifest_path is None:
+        raise ValueError("either queries_synth_path or manifest_path is required")
+    submission_path = Path(submission_path)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    run_id = run_id or os.environ.get("CI_PIPELINE_ID") or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+
+    blobs = {"synthetic": labels_synth_blob}
+    if labels_real_blob is not None:
+        blobs["real"] = labels_real_blob
+
+    manifest = None
+    if manifest_path is not None:
+        manifest = await asyncio.to_thread(Manifest.load, manifest_path)
+        await asyncio.to_thread(manifest.check_sources)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                label_tasks = {
+                    name: tg.create_task(_fetch_labels(storage, blob, Path(tmp), manifest, name))
+                    for name, blob in blobs.items()
+                }
+                validation_task = tg.create_task(
+                    _validate_stream(
+                        submission_path,
+                        Path(products_path),
+                        Path(queries_real_path) if queries_real_path is not None else None,
+                        Path(queries_synth_path) if queries_synth_path is not None else None,
+                        team,
+                        queue,
+                        out_dir / "validation_report.json",
+                        manifest,
+                    )
+                )
+                scoring_task = tg.create_task(_score_stream(queue, label_tasks))
+        except* StaleManifestError as group:
+            raise group.exceptions[0] from None
+
+    validation = validation_task.result()
+    if validation["status"] != "passed":
+        logger.error(f"Validation failed for team {team}, skipping score publication")
+        return {"validation": validation, "score": None}
+
+    metrics = scoring_task.result()
+    score = _combine(team, metrics["synthetic"], metrics.get("real"), w_real, w_synth)
+    metadata = _run_metadata(team, submission_path, run_id)
+
+    writes = [
+        _write_json(out_dir / "score_report.json", score),
+        _write_json(out_dir / "metadata.json", metadata),
+    ]
+    if leaderboard_dir is not None:
+        writes.append(asyncio.to_thread(_publish, Path(leaderboard_dir), team, run_id, score, metadata))
+    await asyncio.gather(*writes)
+    logger.info(f"Pipeline completed for team {team} (run {run_id})")
+    return {"validation": validation, "score": score}
+
+
+def _publish(leaderboard_dir: Path, team: str, run_id: str, score: dict[str, any], metadata: dict[str, any]) -> None:
+    write_run(leaderboard_dir, team, run_id, score, metadata)
+    build_leaderboard(leaderboard_dir)
+
+
+def scoring_inputs_digest(
+    storage: any,
+    products_path: str | Path,
+    queries_synth_path: str | Path | None,
+    labels_synth_blob: str,
+    queries_real_path: str | Path | None = None,
+    labels_real_blob: str | None = None,
+    manifest_path: str | Path | None = None,
+) -> str:
+    """
+    Content digest of every `run_pipeline` input besides the submission: the catalog, the query files
+    or manifest, and the label blobs (fetched once to hash them) plus VALIDATOR_VERSION.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        labels = []
+        for i, blob in enumerate((labels_synth_blob, labels_real_blob)):
+            path = None
+            if blob is not None:
+                path = Path(tmp) / f"{i}-{Path(blob).name}"
+                storage.fetch(blob, path)
+            labels.append(path)
+        return cache_key(
+            VALIDATOR_VERSION, products_path, queries_synth_path, queries_real_path, manifest_path, *labels
+        )
+
+
+def publish_score(
+    leaderboard_dir: str | Path, team: str, run_id: str, score: dict[str, any], submission_path: str | Path
+) -> None:
+    """
+    Record an already computed score on the leaderboard as a new run (stamped now) for `team`, which
+    may differ from the team the score was computed for (byte-identical submissions share scores).
+    """
+    score = {**score, "team": team}
+    _publish(Path(leaderboard_dir), team, run_id, score, _run_metadata(team, Path(submission_path), run_id))
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import math
+from pathlib import Path
+from statistics import NormalDist
+
+from .evaluate import _combine, _load_submission, _score_query
+from .golden import load_golden_set
+from .model import METRIC_NAMES, GoldenSet, IdIndex, Submission
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# first round scores this many queries; every later round doubles the sample
+_INITIAL_SAMPLE = 32
+
+
+def _sample_key(seed: int, query_id: str) -> bytes:
+    return hashlib.blake2b(f"{seed}:{query_id}".encode("utf-8"), digest_size=8).digest()
+
+
+def _strata(submission: Submission, golden: GoldenSet, seed: int) -> list[list[int]]:
+    """
+    Group submitted queries by relevant-label count bucket (0, 1, 2-3, 4-7, ...), each stratum in a
+    fixed pseudo-random order so that every sample is a prefix of the next one.
+    """
+    strata: dict[int, list[int]] = {}
+    for i, qid in enumerate(submission.queries.ids):
+        strata.setdefault(golden.relevant_count(qid).bit_length(), []).append(i)
+    ids = submission.queries.ids
+    return [sorted(members, key=lambda i: _sample_key(seed, ids[i])) for _, members in sorted(strata.items())]
+
+
+def _allocate(strata: list[list[int]], n: int, total: int) -> list[int]:
+    """Proportional allocation of `n` samples over the strata, at least 2 per stratum (for a variance)."""
+    return [min(len(s), max(2, math.ceil(n * len(s) / total))) for s in strata]
+
+
+def _stratified_estimate(scores: list[list[dict[str, float]]], sizes: list[int], total: int) -> dict[str, float]:
+    return {
+        name: sum(size / total * sum(q[name] for q in sample) / len(sample) for size, sample in zip(sizes, scores))
+        for name in METRIC_NAMES
+    }
+
+
+def _stratified_variance(values: list[list[float]], sizes: list[int], total: int) -> float:
+    """Variance of the stratified mean, with finite population correction."""
+    variance = 0.0
+    for sample, size in zip(values, sizes):
+        n = len(sample)
+        if n >= size or n < 2:
+            continue
+        mean = sum(sample) / n
+        s2 = sum((v - mean) ** 2 for v in sample) / (n - 1)
+        variance += (size / total) ** 2 * (1 - n / size) * s2 / n
+    return variance
+
+
+def preview_submission(
+    submission_path: str | Path,
+    labels_path: str | Path,
+    tolerance: float = 0.01,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> dict[str, any]:
+    """
+    Estimate the metrics of `evaluate_submission` from a stratified, deterministic query sample.
+
+    The sample starts small and doubles until the half-width of the composite's confidence interval
+    is at most `tolerance` (or every query has been scored, making the estimate exact). Only newly
+    sampled queries are scored in each round.
+
+    Sampling only saves scoring work: the submission and the labels are still parsed in full (the
+    strata need every submitted query and its relevant count), so the preview is never faster than
+    that parse.
+    """
+    products = IdIndex()
+    golden = load_golden_set(labels_path, products)
+    submission = Submission.from_rows(_load_submission(submission_path), products)
+    return _preview(submission, golden, tolerance, confidence, seed)
+
+
+def _preview(
+    submission: Submission, golden: GoldenSet, tolerance: float, confidence: float, seed: int
+) -> dict[str, any]:
+    total = len(submission.queries)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    strata = _strata(submission, golden, seed)
+    sizes = [len(s) for s in strata]
+    scores: list[list[dict[str, float]]] = [[] for _ in strata]
+    n = _INITIAL_SAMPLE
+    bound = 0.0
+    while total:
+        for stratum, sample, target in zip(strata, scores, _allocate(strata, n, total)):
+            for i in stratum[len(sample) : target]:
+                view = submission.view(i)
+                sample.append(_score_query(view.products, golden, view.query_id))
+        sampled = sum(len(sample) for sample in scores)
+        composites = [[q["composite"] for q in sample] for sample in scores]
+        bound = z * math.sqrt(_stratified_variance(composites, sizes, total))
+        logger.debug(f"preview: {sampled}/{total} queries, composite ± {bound:.4f}")
+        if bound <= tolerance or sampled == total:
+            break
+        n *= 2
+
+    estimate = _stratified_estimate(scores, sizes, total) if total else {name: 0.0 for name in METRIC_NAMES}
+    summary: dict[str, any] = {name: round(estimate[name], 4) for name in METRIC_NAMES}
+    summary["queries_scored"] = sum(len(sample) for sample in scores)
+    summary["queries_total"] = total
+    summary["composite_bound"] = round(bound, 4)
+    summary["confidence"] = confidence
+    return summary
+
+
+def preview_evaluation(
+    submission_path: str | Path,
+    labels_real_path: str | Path | None,
+    labels_synth_path: str | Path,
+    team: str,
+    tolerance: float = 0.01,
+    confidence: float = 0.95,
+    seed: int = 0,
+    w_real: float = 0.7,
+    w_synth: float = 0.3,
+) -> dict[str, any]:
+    """
+    `full_evaluation` on query samples (see `preview_submission`). The combined score carries a
+    bound that is the weighted sum of the per-split bounds. The submission is parsed once and
+    shared by both splits.
+    """
+    products = IdIndex()
+    submission = Submission.from_rows(_load_submission(submission_path), products)
+    synth_golden = load_golden_set(labels_synth_path, products)
+    synth_metrics = _preview(submission, synth_golden, tolerance, confidence, seed)
+    real_metrics = None
+    if labels_real_path is not None:
+        real_golden = load_golden_set(labels_real_path, products)
+        real_metrics = _preview(submission, real_golden, tolerance, confidence, seed)
+    report = _combine(team, synth_metrics, real_metrics, w_real, w_synth)
+    if real_metrics is not None:
+        bound = w_real * real_metrics["composite_bound"] + w_synth * synth_metrics["composite_bound"]
+    else:
+        bound = synth_metrics["composite_bound"]
+    report["combined"]["bound"] = round(bound, 4)
+    report["combined"]["confidence"] = confidence
+    report["preview"] = True
+    return report
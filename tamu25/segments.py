@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .model import METRIC_NAMES, GoldenSet, IdIndex
+from .serialization import load
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# bucket lower bounds and their names
+LENGTH_BUCKETS = ((1, 3, 5), ("1-2 words", "3-4 words", "5+ words"))
+RELEVANT_BUCKETS = ((0, 1, 3, 6, 11), ("0", "1-2", "3-5", "6-10", "11+"))
+UNKNOWN = "unknown"
+
+
+def _bucket(value: int, buckets: tuple[tuple[int, ...], tuple[str, ...]]) -> int:
+    return max(0, bisect_right(buckets[0], value) - 1)
+
+
+def query_words(queries: Iterable[dict[str, any]]) -> dict[str, int]:
+    """query_id -> number of words in the query text, for rows of a queries_*.json file."""
+    return {q["query_id"]: len(q.get("query", "").split()) for q in queries}
+
+
+def load_query_words(paths: Iterable[str | Path]) -> dict[str, int]:
+    words: dict[str, int] = {}
+    for path in paths:
+        words.update(query_words(load(path)))
+    return words
+
+
+def _bincount(groups: Sequence[int], weights: Sequence[float], n: int) -> list[float]:
+    sums = [0.0] * n
+    for g, w in zip(groups, weights):
+        sums[g] += w
+    return sums
+
+
+class Segmentation:
+    """
+    Per-query segment codes, assigned once per query and kept in one array per dimension:
+
+    - set:      real or synthetic (synthetic query ids start with "s" or "S")
+    - relevant: number of relevant products in the golden set (bucketed)
+    - length:   words in the query text (bucketed; only when query word counts are given)
+
+    `reduce` turns per-query metric arrays into per-segment means with one grouped pass per
+    dimension, so slicing costs no extra scoring.
+    """
+
+    def __init__(self, golden: GoldenSet, query_words: dict[str, int] | None = None) -> None:
+        self.golden = golden
+        self.query_words = query_words
+        self.dimensions: dict[str, tuple[str, ...]] = {
+            "set": ("real", "synthetic"),
+            "relevant": RELEVANT_BUCKETS[1],
+        }
+        if query_words is not None:
+            self.dimensions["length"] = LENGTH_BUCKETS[1] + (UNKNOWN,)
+        self.queries = IdIndex()
+        self.codes: dict[str, array] = {dim: array("b") for dim in self.dimensions}
+        for qid in golden.queries.ids:
+            self.index(qid)
+        for qid in query_words or ():
+            self.index(qid)
+
+    def index(self, query_id: str) -> int:
+        """Index of `query_id`, assigning its segment codes the first time it is seen."""
+        i = self.queries.get(query_id)
+        if i >= 0:
+            return i
+        i = self.queries.add(query_id)
+        self.codes["set"].append(1 if query_id[:1] in ("s", "S") else 0)
+        self.codes["relevant"].append(_bucket(self.golden.relevant_count(query_id), RELEVANT_BUCKETS))
+        if self.query_words is not None:
+            words = self.query_words.get(query_id)
+            length = _bucket(words, LENGTH_BUCKETS) if words is not None else len(LENGTH_BUCKETS[1])
+            self.codes["length"].append(length)
+        return i
+
+    def reduce(self, query_ids: Sequence[str], metrics: dict[str, Sequence[float]]) -> dict[str, any]:
+        """
+        {dimension: {segment: {"queries": n, metric: mean, ...}}} for the scored queries, where
+        `metrics[name][i]` belongs to `query_ids[i]`. Empty segments are left out.
+        """
+        rows = [self.index(qid) for qid in query_ids]
+        result: dict[str, any] = {}
+        for dim, names in self.dimensions.items():
+            codes = self.codes[dim]
+            groups = [codes[i] for i in rows]
+            counts = _bincount(groups, [1.0] * len(groups), len(names))
+            sums = {name: _bincount(groups, metrics[name], len(names)) for name in METRIC_NAMES}
+            result[dim] = {
+                segment: {
+                    "queries": int(counts[g]),
+                    **{name: round(sums[name][g] / counts[g], 4) for name in METRIC_NAMES},
+                }
+                for g, segment in enumerate(names)
+                if counts[g]
+            }
+        return result
@@ -0,0 +1,232 @@
+"""
+JSON serialization backend.
+
+Uses msgspec or orjson when installed and falls back to the stdlib `json` module otherwise.
+The backend is picked at import time (override with TAMU25_JSON_BACKEND=msgspec|orjson|json)
+and can be switched with `set_backend`.
+
+All file loaders read through `compression.open_input`, so gzip/zstd/xz-compressed inputs work
+transparently. Submission and label files can be decoded straight into compact typed rows with `decode_rows`,
+which checks field presence and types during decoding and raises `DecodeError` on any mismatch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from .compression import open_text, read_input
+
+try:
+    import msgspec
+except ImportError:  # optional accelerator
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("msgspec", "orjson", "json")
+
+
+class DecodeError(ValueError):
+    """Raised when a document does not match the requested row schema."""
+
+
+if msgspec is not None:
+
+    class SubmissionRow(msgspec.Struct, frozen=True, gc=False):
+        query_id: str
+        rank: int
+        product_id: str
+
+    class LabelRow(msgspec.Struct, frozen=True, gc=False):
+        query_id: str
+        product_id: str
+        relevance: int
+
+else:
+
+    class SubmissionRow(NamedTuple):
+        query_id: str
+        rank: int
+        product_id: str
+
+    class LabelRow(NamedTuple):
+        query_id: str
+        product_id: str
+        relevance: int
+
+
+# field name -> expected type, in constructor order
+_ROW_FIELDS: dict[type, tuple[tuple[str, type], ...]] = {
+    SubmissionRow: (("query_id", str), ("rank", int), ("product_id", str)),
+    LabelRow: (("query_id", str), ("product_id", str), ("relevance", int)),
+}
+
+
+def _available(name: str) -> bool:
+    return {"msgspec": msgspec, "orjson": orjson, "json": json}[name] is not None
+
+
+def _default_backend() -> str:
+    requested = os.environ.get("TAMU25_JSON_BACKEND")
+    if requested:
+        if requested not in BACKENDS or not _available(requested):
+            logger.warning(f"JSON backend '{requested}' is not available, falling back to auto-detection")
+        else:
+            return requested
+    return next(name for name in BACKENDS if _available(name))
+
+
+_backend = _default_backend()
+
+
+def get_backend() -> str:
+    """Name of the active JSON backend."""
+    return _backend
+
+
+def set_backend(name: str) -> None:
+    """Switch the active JSON backend ("msgspec", "orjson" or "json")."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"unknown JSON backend '{name}', expected one of {BACKENDS}")
+    if not _available(name):
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    _backend = name
+
+
+def loads(data: bytes | str) -> any:
+    if _backend == "msgspec":
+        return msgspec.json.decode(data)
+    if _backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load(path: str | Path) -> any:
+    return loads(read_input(path))
+
+
+def dumps(obj: any, indent: int | None = None) -> str:
+    """Serialize to a JSON string. `indent` is 2 or None with the fast backends."""
+    if indent in (None, 2):
+        if _backend == "msgspec":
+            encoded = msgspec.json.encode(obj)
+            return (msgspec.json.format(encoded, indent=2) if indent else encoded).decode("utf-8")
+        if _backend == "orjson":
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    return json.dumps(obj, indent=indent)
+
+
+def dump(obj: any, path: str | Path, indent: int | None = 2) -> None:
+    Path(path).write_text(dumps(obj, indent=indent), encoding="utf-8")
+
+
+def _coerce_rows(items: any, row_type: type) -> list[any]:
+    if not isinstance(items, list):
+        raise DecodeError("expected a JSON array of objects")
+    fields = _ROW_FIELDS[row_type]
+    rows = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise DecodeError(f"row {i}: expected an object, got {type(item).__name__}")
+        values = []
+        for name, expected in fields:
+            value = item.get(name)
+            # exact type check so that e.g. booleans are not accepted as ranks
+            if type(value) is not expected:
+                raise DecodeError(f"row {i}: field '{name}' must be {expected.__name__}, got {value!r}")
+            values.append(value)
+        rows.append(row_type(*values))
+    return rows
+
+
+def decode_rows(data: bytes | str, row_type: type) -> list[any]:
+    """Decode a JSON array of objects into `row_type` rows, validating field types."""
+    if _backend == "msgspec":
+        try:
+            return msgspec.json.decode(data, type=list[row_type])
+        except msgspec.ValidationError as e:
+            raise DecodeError(str(e)) from e
+    return _coerce_rows(loads(data), row_type)
+
+
+def parse_rows(data: bytes | str, row_type: type, strict: bool = True) -> list[any]:
+    """
+    Parse a JSON array of objects as `row_type` rows.
+    With strict=False, a document that fails typed decoding is parsed generically and its rows are
+    built from the expected keys without type checks (missing keys raise KeyError).
+    """
+    try:
+        return decode_rows(data, row_type)
+    except DecodeError:
+        if strict:
+            raise
+    return [row_type(*(row[name] for name, _ in _ROW_FIELDS[row_type])) for row in loads(data)]
+
+
+def load_rows(path: str | Path, row_type: type, strict: bool = True) -> list[any]:
+    """Load a JSON array of objects as `row_type` rows (see `parse_rows`)."""
+    return parse_rows(read_input(path), row_type, strict)
+
+
+def iter_array(path: str | Path, chunk_size: int = 1 << 20) -> Iterator[any]:
+    """
+    Stream the elements of a top-level JSON array without loading the whole document.
+    Reads `chunk_size` characters at a time; raises DecodeError if the document is not an array
+    (including missing or stray commas between elements).
+    """
+    decoder = json.JSONDecoder()
+    with open_text(path) as f:
+        buf = ""
+        while not buf and (chunk := f.read(chunk_size)):
+            buf = chunk.lstrip()
+        if not buf.startswith("["):
+            raise DecodeError("expected a JSON array")
+        pos = 1
+        eof = False
+        # an element must follow "[" (unless the array is empty) and ","; "," or "]" must follow an element
+        expect_item, empty = True, True
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                if not expect_item:
+                    if buf[pos] == "]":
+                        return
+                    if buf[pos] != ",":
+                        raise DecodeError(f"expected ',' or ']' after an array element, got {buf[pos]!r}")
+                    pos += 1
+                    expect_item = True
+                    continue
+                if empty and buf[pos] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                    # an element touching the end of the buffer may continue in the next chunk
+                    complete = end < len(buf) or eof
+                except json.JSONDecodeError as e:
+                    if eof:
+                        raise DecodeError(str(e)) from e
+                    complete = False
+                if complete:
+                    yield item
+                    pos = end
+                    expect_item = empty = False
+                    continue
+            elif eof:
+                raise DecodeError("unterminated JSON array")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
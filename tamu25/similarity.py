@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from array import array
+from pathlib import Path
+
+from .compression import read_input
+from .model import Submission
+from .serialization import SubmissionRow, parse_rows
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# MinHash signature length and its LSH banding (32 bands x 4 rows: pairs with Jaccard ~0.45+
+# usually share a band, pairs below ~0.2 rarely do)
+NUM_HASHES = 128
+BANDS = 32
+# (query_id, product_id) pairs in the top DEPTH ranks of every query make up a submission's set
+DEPTH = 30
+# rank-biased sketch: the top RBO_DEPTH products of RBO_QUERIES hash-sampled queries
+RBO_QUERIES = 32
+RBO_DEPTH = 10
+RBO_P = 0.9
+
+_EMPTY = 2**64 - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketches (
+    team      TEXT NOT NULL,
+    digest    TEXT NOT NULL,
+    source    TEXT,
+    minhash   BLOB NOT NULL,
+    ranked    BLOB NOT NULL,
+    PRIMARY KEY (team, digest)
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band      INTEGER NOT NULL,
+    bucket    BLOB NOT NULL,
+    team      TEXT NOT NULL,
+    digest    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+CREATE TABLE IF NOT EXISTS pairs (
+    team_a    TEXT NOT NULL,
+    digest_a  TEXT NOT NULL,
+    team_b    TEXT NOT NULL,
+    digest_b  TEXT NOT NULL,
+    jaccard   REAL NOT NULL,
+    rbo       REAL NOT NULL,
+    PRIMARY KEY (team_a, digest_a, team_b, digest_b)
+);
+"""
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def minhash(tokens: list[str], num_hashes: int = NUM_HASHES) -> array:
+    """
+    One-permutation MinHash: each token is hashed once, the hash picks a bin and the rest of it
+    competes for that bin's minimum. Empty bins borrow from the next non-empty bin (rotation).
+    """
+    signature = array("Q", [_EMPTY]) * num_hashes
+    for token in tokens:
+        h = _hash64(token)
+        b, v = h % num_hashes, h // num_hashes
+        if v < signature[b]:
+            signature[b] = v
+    filled = [i for i, v in enumerate(signature) if v != _EMPTY]
+    if filled:
+        for i in range(num_hashes):
+            if signature[i] == _EMPTY:
+                # nearest filled bin to the right, offset by the distance so borrowed values differ
+                j = next((f for f in filled if f > i), filled[0])
+                signature[i] = (signature[j] + (j - i) % num_hashes) & _EMPTY
+    return signature
+
+
+def ranked_sketch(submission: Submission, n_queries: int = RBO_QUERIES, depth: int = RBO_DEPTH) -> array:
+    """
+    Top-`depth` product hashes of the `n_queries` queries with the smallest query-id hash, as flat
+    rows of [query hash, product hashes...] (0-padded). Submissions covering the same queries sample
+    the same ones.
+    """
+    ids = submission.queries.ids
+    sampled = sorted(range(len(ids)), key=lambda i: _hash64(ids[i]))[:n_queries]
+    sketch = array("Q")
+    for i in sorted(sampled, key=lambda i: ids[i]):
+        view = submission.view(i)
+        top = [_hash64(submission.products.ids[p]) for p in view.products[:depth]]
+        sketch.append(_hash64(ids[i]))
+        sketch.extend(top + [0] * (depth - len(top)))
+    return sketch
+
+
+def rbo(a: list[int], b: list[int], p: float = RBO_P) -> float:
+    """
+    Rank-biased overlap of two equal-depth prefixes, normalized so identical prefixes score 1.
+    """
+    depth = len(a)
+    seen_a: set[int] = set()
+    seen_b: set[int] = set()
+    overlap = 0
+    total = 0.0
+    for d in range(depth):
+        x, y = a[d], b[d]
+        if x == y:
+            overlap += x != 0
+        else:
+            overlap += (x in seen_b and x != 0) + (y in seen_a and y != 0)
+        seen_a.add(x)
+        seen_b.add(y)
+        total += p**d * overlap / (d + 1)
+    return total * (1 - p) / (1 - p**depth) if depth else 0.0
+
+
+def estimate_rbo(sketch_a: array, sketch_b: array, depth: int = RBO_DEPTH) -> float:
+    """Mean RBO over the sampled queries present in both sketches."""
+    width = depth + 1
+    rows_b = {sketch_b[i]: sketch_b[i + 1 : i + width] for i in range(0, len(sketch_b), width)}
+    scores = []
+    for i in range(0, len(sketch_a), width):
+        other = rows_b.get(sketch_a[i])
+        if other is not None:
+            scores.append(rbo(list(sketch_a[i + 1 : i + width]), list(other)))
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def _bands(signature: array, bands: int = BANDS) -> list[bytes]:
+    rows = len(signature) // bands
+    return [signature[b * rows : (b + 1) * rows].tobytes() for b in range(bands)]
+
+
+class SimilarityIndex:
+    """
+    SQLite-backed LSH index of submission sketches.
+
+    Each submission (keyed by team and content sha256) is reduced to a MinHash signature over its
+    top-ranked (query_id, product_id) pairs plus a small rank-biased sketch. Adding a submission
+    only compares it with the submissions sharing an LSH band, so cost does not grow with the
+    number of indexed rows; candidate pairs from different teams are stored with their Jaccard and
+    RBO estimates.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> SimilarityIndex:
+        return self
+
+    def __exit__(self, *exc: any) -> None:
+        self.close()
+
+    def contains(self, team: str, digest: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM sketches WHERE team = ? AND digest = ?", (team, digest)).fetchone()
+        return row is not None
+
+    def add(self, team: str, submission_path: str | Path) -> bool:
+        """Index one submission file. Returns False if this exact file was already indexed for `team`."""
+        data = read_input(submission_path)
+        digest = hashlib.sha256(data).hexdigest()
+        if self.contains(team, digest):
+            return False
+        submission = Submission.from_rows(parse_rows(data, SubmissionRow, strict=False))
+        tokens = []
+        for view in submission:
+            tokens += [f"{view.query_id}\x00{submission.products.ids[p]}" for p in view.products[:DEPTH]]
+        self.add_sketch(team, digest, minhash(tokens), ranked_sketch(submission), str(submission_path))
+        return True
+
+    def add_sketch(self, team: str, digest: str, signature: array, ranked: array, source: str | None = None) -> None:
+        buckets = _bands(signature)
+        candidates: set[tuple[str, str]] = set()
+        for band, bucket in enumerate(buckets):
+            candidates.update(
+                self.conn.execute(
+                    "SELECT team, digest FROM bands WHERE band = ? AND bucket = ? AND team != ?", (band, bucket, team)
+                )
+            )
+
+        pairs = []
+        for other_team, other_digest in candidates:
+            other_sig, other_ranked = self.conn.execute(
+                "SELECT minhash, ranked FROM sketches WHERE team = ? AND digest = ?", (other_team, other_digest)
+            ).fetchone()
+            other_sig, other_ranked = array("Q", other_sig), array("Q", other_ranked)
+            jaccard = sum(x == y for x, y in zip(signature, other_sig)) / len(signature)
+            (team_a, digest_a), (team_b, digest_b) = sorted([(team, digest), (other_team, other_digest)])
+            pairs.append((team_a, digest_a, team_b, digest_b, jaccard, estimate_rbo(ranked, other_ranked)))
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sketches (team, digest, source, minhash, ranked) VALUES (?, ?, ?, ?, ?)",
+                (team, digest, source, signature.tobytes(), ranked.tobytes()),
+            )
+            self.conn.executemany(
+                "INSERT INTO bands (band, bucket, team, digest) VALUES (?, ?, ?, ?)",
+                [(band, bucket, team, digest) for band, bucket in enumerate(buckets)],
+            )
+            self.conn.executemany("INSERT OR REPLACE INTO pairs VALUES (?, ?, ?, ?, ?, ?)", pairs)
+
+    def add_teams(self, teams_dir: str | Path) -> int:
+        """Index every teams/<team>/submission.json not seen before. Returns the number added."""
+        added = 0
+        for path in sorted(Path(teams_dir).glob("*/submission.json")):
+            try:
+                added += self.add(path.parent.name, path)
+            except Exception as e:
+                logger.warning(f"skipping {path}: {e}")
+        if added:
+            logger.info(f"indexed {added} new submissions in {self.path}")
+        return added
+
+    def suspicious_pairs(self, min_rbo: float = 0.8) -> list[dict[str, any]]:
+        """Cross-team submission pairs with estimated RBO >= `min_rbo`, most similar first."""
+        rows = self.conn.execute(
+            """
+            SELECT p.team_a, p.team_b, p.jaccard, p.rbo, a.source, b.source
+            FROM pairs p
+            JOIN sketches a ON a.team = p.team_a AND a.digest = p.digest_a
+            JOIN sketches b ON b.team = p.team_b AND b.digest = p.digest_b
+            WHERE p.rbo >= ?
+            ORDER BY p.rbo DESC, p.jaccard DESC, p.team_a, p.team_b
+            """,
+            (min_rbo,),
+        ).fetchall()
+        return [
+            {
+                "team_a": team_a,
+                "team_b": team_b,
+                "jaccard": round(jaccard, 4),
+                "rbo": round(score, 4),
+                "source_a": source_a,
+                "source_b": source_b,
+            }
+            for team_a, team_b, jaccard, score, source_a, source_b in rows
+        ]
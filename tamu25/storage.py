@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+
+from google.cloud import storage
+
+from .compression import compress_bytes, detect
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class LocalStorage:
+    """
+    Offline stand-in for a GCS bucket: blob names resolve to files under a local root directory.
+    Used for local runs and tests of the pipeline.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def exists(self, blob_name: str) -> bool:
+        return (self.root / blob_name).is_file()
+
+    def fetch(self, blob_name: str, destination: str | Path) -> Path:
+        source = self.root / blob_name
+        if not source.is_file():
+            raise FileNotFoundError(f"File {blob_name} does not exist in {self.root}")
+        destination_path = Path(destination).resolve()
+        destination_path.parent.mkdir(parents=True, exist_ok=True)
+        if source.resolve() != destination_path:
+            shutil.copyfile(source, destination_path)
+        logger.info(f"Fetched {blob_name} to {destination_path}")
+        return destination_path
+
+    def upload(self, source: str | Path, blob_name: str) -> None:
+        target = self.root / blob_name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        logger.info(f"Uploaded {source} to {target}")
+
+
+class GCSStorage:
+    """
+    Google Cloud Storage bucket, authenticated via GOOGLE_APPLICATION_CREDENTIALS.
+
+    Blobs are uploaded gzip-compressed (Content-Encoding: gzip) and downloaded as stored, without
+    decompressive transcoding; the loaders decompress them while parsing.
+    """
+
+    def __init__(self, bucket_name: str) -> None:
+        self.bucket_name = bucket_name
+        self.bucket = storage.Client().bucket(bucket_name)
+
+    def exists(self, blob_name: str) -> bool:
+        return self.bucket.blob(blob_name).exists()
+
+    def fetch(self, blob_name: str, destination: str | Path) -> Path:
+        blob = self.bucket.blob(blob_name)
+        if not blob.exists():
+            raise FileNotFoundError(f"File {blob_name} does not exist in bucket {self.bucket_name}")
+        destination_path = Path(destination).resolve()
+        destination_path.parent.mkdir(parents=True, exist_ok=True)
+        blob.download_to_filename(str(destination_path), raw_download=True)
+        logger.info(f"Downloaded {blob_name} to {destination_path}")
+        return destination_path
+
+    def upload(self, source: str | Path, blob_name: str) -> None:
+        blob = self.bucket.blob(blob_name)
+        data = Path(source).read_bytes()
+        if detect(data) is None:
+            data = compress_bytes(data)
+            blob.content_encoding = "gzip"
+        blob.upload_from_string(data, content_type="application/json")
+        logger.info(f"Uploaded {source} to gs://{self.bucket_name}/{blob_name}")
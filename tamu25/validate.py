@@ -1,16 +1,28 @@
 from __future__ import annotations
 
-import json
 import logging
-from collections import defaultdict
+from array import array
 from pathlib import Path
+from typing import Collection, Container
+
+from .cache import ValidationCache, cache_key
+from .compression import read_input
+from .external import sorted_query_groups
+from .manifest import Manifest
+from .model import IdIndex, QueryView, Submission
+from .serialization import DecodeError, SubmissionRow, decode_rows, iter_array, loads
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Part of every validation cache key: bump whenever the validation rules or report format change.
+VALIDATOR_VERSION = 1
+# Ranks and product indices are held in int32 arrays (see model.Submission).
+_RANK_RANGE = range(-(2**31), 2**31)
 
-def _load_json(path: str | Path) -> dict[str, any] | list[any]:
+
+def _read_bytes(path: str | Path) -> bytes:
     file_path = Path(path)
     if not file_path.exists():
         logger.error(f"File not found: {path}")
@@ -19,8 +31,24 @@ def _load_json(path: str | Path) -> dict[str, any] | list[any]:
         logger.debug(f"File found: {path}")
 
     logger.debug(f"Loading JSON from: {path}")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_input(file_path)
+
+
+def _load_json(path: str | Path) -> dict[str, any] | list[any]:
+    return loads(_read_bytes(path))
+
+
+def _load_submission(path: str | Path) -> any:
+    """
+    Decode the submission into typed SubmissionRow rows. If any row has a missing or mistyped
+    field, fall back to the raw JSON document so the per-row checks can report every problem.
+    """
+    data = _read_bytes(path)
+    try:
+        return decode_rows(data, SubmissionRow)
+    except DecodeError as e:
+        logger.debug(f"typed decoding failed, falling back to per-row checks: {e}")
+        return loads(data)
 
 
 def _extract_products(products_raw: dict[str, any] | list[any]) -> set[str]:
@@ -43,16 +71,8 @@ def _extract_products(products_raw: dict[str, any] | list[any]) -> set[str]:
     return ids
 
 
-def validate_submission(
-    submission_path: str | Path,
-    products_path: str | Path,
-    queries_real_path: str | Path | None,
-    queries_synth_path: str | Path,
-    team: str,
-    max_team_dirs: int = 1,
-) -> dict[str, any]:
-    """Validate team submission according to DSCOE Datathon rules."""
-    report: dict[str, any] = {
+def _new_report(team: str) -> dict[str, any]:
+    return {
         "team": team,
         "status": "failed",
         "errors": [],
@@ -61,46 +81,25 @@ def validate_submission(
         "avg_depth": None,
     }
 
-    submission_file = Path(submission_path)
-    if not submission_file.exists():
-        logger.error(f"submission file not found: {submission_path}")
-        report["errors"].append(f"submission file not found: {submission_path}")
-        return report
-    logger.info(f"validating submission file: {submission_path}")
-    # load reference
-    logger.info(f"loading products from: {products_path}")
-    products_raw = _load_json(products_path)
-
-    if queries_real_path is not None:
-        logger.info(f"loading real queries from: {queries_real_path}")
-        queries_real = _load_json(queries_real_path)
-    else:
-        logger.info("no real queries provided, validating synthetic queries only")
-        queries_real = []
-
-    logger.info(f"loading synthetic queries from: {queries_synth_path}")
-    queries_synth = _load_json(queries_synth_path)
-    logger.debug("extracting valid products")
-    valid_products = _extract_products(products_raw)
 
+def _required_queries(queries_real: list[dict[str, any]], queries_synth: list[dict[str, any]]) -> set[str]:
     required_queries: set[str] = set()
     for q in queries_real:
         required_queries.add(q["query_id"])
     for q in queries_synth:
         required_queries.add(q["query_id"])
-    logger.debug(f"total required queries: {len(required_queries)}")
-    # load submission
-    logger.info(f"loading submission from {submission_path}")
-    submission = _load_json(submission_path)
-    if not isinstance(submission, list):
-        report["errors"].append("submission must be a JSON array of objects")
-        return report
+    return required_queries
 
-    per_query = defaultdict(list)
-    seen_pairs: set[tuple[str, str]] = set()
-    duplicate_pairs = []
 
+def _row_fields(submission: list[any], report: dict[str, any]) -> any:
+    """Yield (query_id, rank, product_id) per row. Untyped rows are checked for required fields and types first."""
     for row in submission:
+        if isinstance(row, SubmissionRow):
+            if row.rank not in _RANK_RANGE:
+                report["errors"].append(f"row rank out of range: {row.query_id} rank {row.rank}")
+                continue
+            yield row.query_id, row.rank, row.product_id
+            continue
         if not isinstance(row, dict):
             report["errors"].append(f"submission rows must be objects, got: {row}")
             continue
@@ -111,48 +110,71 @@ def validate_submission(
         if qid is None or rank is None or pid is None:
             report["errors"].append(f"row missing field(s): {row}")
             continue
+        if not isinstance(qid, str) or not isinstance(pid, str):
+            report["errors"].append(f"row query_id and product_id must be strings: {row}")
+            continue
+        if not isinstance(rank, int) or isinstance(rank, bool):
+            report["errors"].append(f"row rank must be an integer: {row}")
+            continue
+        if rank not in _RANK_RANGE:
+            report["errors"].append(f"row rank out of range: {row}")
+            continue
+        yield qid, rank, pid
 
-        # duplicates
-        pair = (qid, pid)
-        if pair in seen_pairs:
-            duplicate_pairs.append({"query_id": qid, "product_id": pid})
-        seen_pairs.add(pair)
-
-        # product check
-        if pid not in valid_products:
-            report["errors"].append(f"unknown product_id '{pid}' for query_id '{qid}'")
-
-        per_query[qid].append((rank, pid))
 
-    # coverage check
-    missing_queries = [qid for qid in required_queries if qid not in per_query]
+def _check_coverage(required_queries: Collection[str], submitted: Container[str], report: dict[str, any]) -> None:
+    missing_queries = [qid for qid in required_queries if qid not in submitted]
     if missing_queries:
         report["errors"].append(f"missing {len(missing_queries)} queries from submission")
         report["warnings"].append({"missing_queries_sample": missing_queries[:20]})
 
-    # per-query checks
-    total_depth = 0
-    qcount = 0
-    for qid, rows in per_query.items():
-        qcount += 1
-        rows_sorted = sorted(rows, key=lambda x: x[0])
-        total_depth += len(rows_sorted)
-
-        if len(rows_sorted) < 30:
-            report["errors"].append(f"query '{qid}' has only {len(rows_sorted)} results, need at least 30")
-
-        expected = 1
-        for r, _ in rows_sorted:
-            if r != expected:
-                report["errors"].append(
-                    f"query '{qid}' ranks must be continuous starting at 1. found {r}, expected {expected}"
-                )
-                break
-            expected += 1
 
-    report["queries_checked"] = qcount
-    report["avg_depth"] = round(total_depth / qcount, 2) if qcount else 0
+def _check_query(
+    view: QueryView,
+    products: IdIndex,
+    catalog_size: int,
+    report: dict[str, any],
+    duplicate_pairs: list[dict[str, str]],
+    unknown_ids: list[str] | None = None,
+) -> bool:
+    """
+    Product, duplicate, depth and rank-continuity checks for one query. Product indices below
+    `catalog_size` are catalog products. Indices past the end of `products` name `unknown_ids`
+    (products kept out of the shared index). Returns True if the query passed.
+    """
+    qid = view.query_id
+
+    def _product_id(p: int) -> str:
+        return products.ids[p] if p < len(products.ids) else unknown_ids[p - len(products.ids)]
 
+    errors_before = len(report["errors"])
+    duplicates_before = len(duplicate_pairs)
+
+    seen: set[int] = set()
+    for p in view.products:
+        # product check
+        if p >= catalog_size:
+            report["errors"].append(f"unknown product_id '{_product_id(p)}' for query_id '{qid}'")
+        # duplicates
+        if p in seen:
+            duplicate_pairs.append({"query_id": qid, "product_id": _product_id(p)})
+        seen.add(p)
+
+    if len(view) < 30:
+        report["errors"].append(f"query '{qid}' has only {len(view)} results, need at least 30")
+
+    expected = 1
+    for r in view.ranks:
+        if r != expected:
+            report["errors"].append(
+                f"query '{qid}' ranks must be continuous starting at 1. found {r}, expected {expected}"
+            )
+            break
+        expected += 1
+    return len(report["errors"]) == errors_before and len(duplicate_pairs) == duplicates_before
+
+
+def _finalize(report: dict[str, any], duplicate_pairs: list[dict[str, str]]) -> dict[str, any]:
     if duplicate_pairs:
         report["errors"].append(f"found duplicate (query_id, product_id) pairs: {duplicate_pairs[:10]}")
 
@@ -163,3 +185,158 @@ def validate_submission(
         report["status"] = "passed"
 
     return report
+
+
+def _validate_external(
+    submission_path: str | Path,
+    products: IdIndex,
+    required_queries: Collection[str],
+    report: dict[str, any],
+    memory_limit_mb: float,
+) -> dict[str, any]:
+    catalog_size = len(products)
+    submitted: set[str] = set()
+    duplicate_pairs: list[dict[str, str]] = []
+    total_depth = 0
+    try:
+        fields = _row_fields(iter_array(submission_path), report)
+        for qid, rows in sorted_query_groups(fields, memory_limit_mb):
+            submitted.add(qid)
+            total_depth += len(rows)
+            # unknown products get per-query indices past the catalog instead of growing the index
+            unknown = IdIndex()
+            indices = array("i")
+            for _, pid in rows:
+                p = products.get(pid)
+                indices.append(p if p >= 0 else catalog_size + unknown.add(pid))
+            view = QueryView(qid, array("i", [r for r, _ in rows]), indices)
+            _check_query(view, products, catalog_size, report, duplicate_pairs, unknown.ids)
+    except DecodeError:
+        report["errors"].append("submission must be a JSON array of objects")
+        return report
+
+    _check_coverage(required_queries, submitted, report)
+    report["queries_checked"] = len(submitted)
+    report["avg_depth"] = round(total_depth / len(submitted), 2) if submitted else 0
+    return _finalize(report, duplicate_pairs)
+
+
+def validate_submission(
+    submission_path: str | Path,
+    products_path: str | Path,
+    queries_real_path: str | Path | None,
+    queries_synth_path: str | Path | None,
+    team: str,
+    max_team_dirs: int = 1,
+    memory_limit_mb: float | None = None,
+    cache: ValidationCache | None = None,
+    manifest_path: str | Path | None = None,
+) -> dict[str, any]:
+    """
+    Validate team submission according to DSCOE Datathon rules.
+    With `memory_limit_mb`, the submission is streamed and externally sorted by query instead of
+    being loaded into memory, and queries are checked one at a time.
+    With `cache`, a report for byte-identical submission, catalog and query files (and the same
+    VALIDATOR_VERSION) is returned without re-validating.
+    With `manifest_path` (see `tamu25 build-manifest`), the required queries come from the split's
+    manifest and the query files are not parsed. Query files the manifest was built from that are
+    still present must be unchanged (else StaleManifestError), so a cached report keyed on the
+    manifest can never outlive its queries.
+    """
+    report = _new_report(team)
+
+    submission_file = Path(submission_path)
+    if not submission_file.exists():
+        logger.error(f"submission file not found: {submission_path}")
+        report["errors"].append(f"submission file not found: {submission_path}")
+        return report
+
+    manifest = None
+    if manifest_path is not None:
+        logger.info(f"loading required queries from manifest: {manifest_path}")
+        manifest = Manifest.load(manifest_path)
+        manifest.check_sources()
+        # the manifest records the (just verified) query files' hashes, so it stands in for them
+        query_inputs = (manifest_path,)
+    elif queries_synth_path is not None:
+        query_inputs = (queries_real_path, queries_synth_path)
+    else:
+        raise ValueError("either queries_synth_path or manifest_path is required")
+
+    def _run() -> dict[str, any]:
+        if manifest is not None:
+            required_queries = manifest.queries.ids
+        else:
+            required_queries = _load_required_queries(queries_real_path, queries_synth_path)
+        return _validate(submission_path, products_path, required_queries, report, memory_limit_mb)
+
+    if cache is None:
+        return _run()
+
+    key = cache_key(VALIDATOR_VERSION, submission_path, products_path, *query_inputs)
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"validation cache hit for {submission_path} ({key[:12]})")
+        cached["team"] = team
+        return cached
+    report = _run()
+    cache.put(key, report)
+    return report
+
+
+def _load_required_queries(queries_real_path: str | Path | None, queries_synth_path: str | Path) -> set[str]:
+    if queries_real_path is not None:
+        logger.info(f"loading real queries from: {queries_real_path}")
+        queries_real = _load_json(queries_real_path)
+    else:
+        logger.info("no real queries provided, validating synthetic queries only")
+        queries_real = []
+
+    logger.info(f"loading synthetic queries from: {queries_synth_path}")
+    queries_synth = _load_json(queries_synth_path)
+    return _required_queries(queries_real, queries_synth)
+
+
+def _validate(
+    submission_path: str | Path,
+    products_path: str | Path,
+    required_queries: Collection[str],
+    report: dict[str, any],
+    memory_limit_mb: float | None,
+) -> dict[str, any]:
+    logger.info(f"validating submission file: {submission_path}")
+    # load reference
+    logger.info(f"loading products from: {products_path}")
+    products_raw = _load_json(products_path)
+
+    logger.debug("extracting valid products")
+    products = IdIndex(_extract_products(products_raw))
+    catalog_size = len(products)
+
+    logger.debug(f"total required queries: {len(required_queries)}")
+    if memory_limit_mb is not None:
+        logger.info(f"streaming submission from {submission_path} (memory limit {memory_limit_mb} MB)")
+        return _validate_external(submission_path, products, required_queries, report, memory_limit_mb)
+
+    # load submission
+    logger.info(f"loading submission from {submission_path}")
+    submission = _load_submission(submission_path)
+    if not isinstance(submission, list):
+        report["errors"].append("submission must be a JSON array of objects")
+        return report
+
+    grouped = Submission.from_fields(_row_fields(submission, report), products)
+
+    # coverage check
+    _check_coverage(required_queries, grouped.queries, report)
+
+    # per-query checks
+    duplicate_pairs: list[dict[str, str]] = []
+    for view in grouped:
+        _check_query(view, products, catalog_size, report, duplicate_pairs)
+
+    qcount = len(grouped.queries)
+    report["queries_checked"] = qcount
+    report["avg_depth"] = round(len(grouped) / qcount, 2) if qcount else 0
+
+    return _finalize(report, duplicate_pairs)
@@ -49,3 +49,24 @@ def workdir(tmp_path: Path, sample_data_dir: Path, repo_root: Path) -> Path:
 def read_json(p: Path):
     with p.open("r", encoding="utf-8") as f:
         return json.load(f)
+
+
+@pytest.fixture(scope="function")
+def passing_workdir(workdir: Path) -> Path:
+    """
+    Extend `workdir` so the team_alpha submission passes validation:
+    the catalog is padded to 40 products and every real/synthetic query gets 30 ranked results.
+    """
+    products = read_json(workdir / "data" / "products.json")
+    products += [{"product_id": f"{i:04d}", "title": f"Filler Product {i}"} for i in range(len(products) + 1, 41)]
+    (workdir / "data" / "products.json").write_text(json.dumps(products, indent=2), encoding="utf-8")
+
+    product_ids = [p["product_id"] for p in products]
+    rows = []
+    for name in ["queries_real.json", "queries_synth.json"]:
+        for i, q in enumerate(read_json(workdir / "data" / name)):
+            ranked = product_ids[i:] + product_ids[:i]
+            rows += [{"query_id": q["query_id"], "rank": r, "product_id": pid} for r, pid in enumerate(ranked[:30], 1)]
+    sub_path = workdir / "teams" / "team_alpha" / "submission.json"
+    sub_path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    return workdir
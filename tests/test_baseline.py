@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tamu25.baseline import BM25Index, build_baseline_submission, load_or_build_index
+from tamu25.validate import validate_submission
+
+
+def test_bm25_ranks_matching_titles_first(sample_data_dir: Path):
+    index = BM25Index.from_catalog(sample_data_dir / "products.json")
+    top = [index.products.ids[doc] for doc, _ in index.search("tomato soup low sodium", 3)]
+    assert top[0] == "0003"
+    assert "0009" in top
+    assert index.search("no such words") == []
+
+
+def test_index_persists_and_rebuilds_on_catalog_change(workdir: Path):
+    products = workdir / "data" / "products.json"
+    index_path = workdir / "baseline.idx"
+    built = load_or_build_index(products, index_path)
+    loaded = BM25Index.load(index_path)
+    assert loaded.products.ids == built.products.ids
+    assert loaded.search("organic milk") == built.search("organic milk")
+
+    catalog = json.loads(products.read_text())
+    catalog.append({"product_id": "0099", "title": "Organic Milk Chocolate"})
+    products.write_text(json.dumps(catalog), encoding="utf-8")
+    rebuilt = load_or_build_index(products, index_path)
+    assert "0099" in rebuilt.products
+    assert "0099" in BM25Index.load(index_path).products
+
+
+def test_baseline_submission_validates(passing_workdir: Path):
+    data = passing_workdir / "data"
+    out = passing_workdir / "teams" / "baseline" / "submission.json"
+    out.parent.mkdir(parents=True)
+    summary = build_baseline_submission(
+        data / "products.json", [data / "queries_real.json", data / "queries_synth.json"], out
+    )
+    assert summary["rows"] == 30 * summary["queries"]
+
+    report = validate_submission(
+        out, data / "products.json", data / "queries_real.json", data / "queries_synth.json", "baseline"
+    )
+    assert report["status"] == "passed", report["errors"]
+
+
+def test_index_accepts_id_only_catalogs(tmp_path: Path):
+    catalog = tmp_path / "products.json"
+    catalog.write_text(json.dumps(["0001", "0002", "0003"]), encoding="utf-8")
+    index = BM25Index.from_catalog(catalog)
+    assert index.products.ids == ["0001", "0002", "0003"]
+    assert index.search("milk") == []
+
+    catalog.write_text(json.dumps([["0001"]]), encoding="utf-8")
+    with pytest.raises(ValueError, match="product objects or id strings"):
+        BM25Index.from_catalog(catalog)
@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+from tamu25.cache import ValidationCache
+from tamu25.storage import LocalStorage
+from tamu25.validate import validate_submission
+
+
+def _validate(workdir: Path, cache: ValidationCache, team: str = "team_alpha") -> dict:
+    data = workdir / "data"
+    return validate_submission(
+        workdir / "teams" / "team_alpha" / "submission.json",
+        data / "products.json",
+        data / "queries_real.json",
+        data / "queries_synth.json",
+        team,
+        cache=cache,
+    )
+
+
+def test_identical_inputs_hit_the_cache(passing_workdir: Path):
+    cache = ValidationCache(passing_workdir / "cache")
+    first = _validate(passing_workdir, cache)
+    assert first["status"] == "passed"
+    [entry] = list((passing_workdir / "cache").glob("*.json"))
+
+    # a cached report is returned as stored (only the team is refreshed)
+    entry.write_text(entry.read_text().replace('"passed"', '"cached"'), encoding="utf-8")
+    second = _validate(passing_workdir, cache, team="team_bravo")
+    assert second["status"] == "cached"
+    assert second["team"] == "team_bravo"
+
+    # any byte change in an input is a miss
+    sub = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    sub.write_text(sub.read_text() + "\n", encoding="utf-8")
+    assert _validate(passing_workdir, cache)["status"] == "passed"
+    assert len(list((passing_workdir / "cache").glob("*.json"))) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path):
+    cache = ValidationCache(tmp_path, max_entries=2)
+    for i, key in enumerate(["a", "b"]):
+        cache.put(key, {"status": key})
+        os.utime(tmp_path / f"{key}.json", (i, i))
+    assert cache.get("a") == {"status": "a"}  # refreshes "a"
+    cache.put("c", {"status": "c"})
+    assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["a", "c"]
+
+
+def test_eviction_tolerates_concurrently_removed_entries(tmp_path: Path, monkeypatch):
+    cache = ValidationCache(tmp_path, max_entries=1)
+    cache.put("a", {"status": "a"})
+    glob = Path.glob
+
+    def glob_then_remove(self, pattern):
+        paths = list(glob(self, pattern))
+        (tmp_path / "a.json").unlink(missing_ok=True)  # another runner evicts "a" after the listing
+        return paths
+
+    monkeypatch.setattr(Path, "glob", glob_then_remove)
+    cache.put("b", {"status": "b"})
+    assert [p.stem for p in glob(tmp_path, "*.json")] == ["b"]
+
+
+def test_shared_store_is_consulted_on_local_miss(passing_workdir: Path):
+    shared = LocalStorage(passing_workdir / "shared")
+    report = _validate(passing_workdir, ValidationCache(passing_workdir / "runner1", shared=shared))
+    assert list((passing_workdir / "shared" / "validation-cache").glob("*.json"))
+
+    other = ValidationCache(passing_workdir / "runner2", shared=shared)
+    assert _validate(passing_workdir, other) == report
+    assert len(list((passing_workdir / "runner2").glob("*.json"))) == 1
@@ -0,0 +1,69 @@
+import gzip
+import lzma
+from pathlib import Path
+
+import pytest
+
+from tamu25.compression import compress_file, detect_file, read_input
+from tamu25.evaluate import full_evaluation
+from tamu25.serialization import iter_array, load
+from tamu25.validate import validate_submission
+
+
+@pytest.mark.parametrize("codec", ["gzip", "xz", "zstd"])
+def test_compress_round_trip(workdir: Path, codec: str):
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    src = workdir / "data" / "labels_real.json"
+    out = compress_file(src, codec=codec)
+    names = {"gzip": "labels_real.json.gz", "xz": "labels_real.json.xz", "zstd": "labels_real.json.zst"}
+    assert out.name == names[codec]
+    assert detect_file(out) == codec
+    assert read_input(out) == src.read_bytes()
+    assert load(out) == load(src)
+    assert list(iter_array(out, chunk_size=64)) == load(src)
+
+
+def test_recompressing_reencodes_to_the_requested_codec(workdir: Path):
+    src = workdir / "data" / "labels_real.json"
+    gz = compress_file(src, codec="gzip")
+    xz = compress_file(gz, codec="xz")
+    assert xz.name == "labels_real.json.xz"
+    assert detect_file(xz) == "xz"
+    assert read_input(xz) == src.read_bytes()
+    # same codec: copied unchanged
+    copy = compress_file(gz, workdir / "copy.json.gz", codec="gzip")
+    assert copy.read_bytes() == gz.read_bytes()
+
+
+def test_recompressing_in_place_keeps_the_content(workdir: Path):
+    src = workdir / "data" / "labels_real.json"
+    expected = src.read_bytes()
+    gz = compress_file(src, codec="gzip")
+    assert compress_file(gz, gz, codec="xz") == gz
+    assert detect_file(gz) == "xz"
+    assert read_input(gz) == expected
+    assert compress_file(src, src, codec="gzip") == src
+    assert read_input(src) == expected
+    assert not list(src.parent.glob(".*.tmp"))
+
+
+def test_compressed_files_are_detected_by_content(passing_workdir: Path):
+    """Inputs keep their .json names but hold compressed bytes."""
+    data = passing_workdir / "data"
+    sub = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    plain = full_evaluation(sub, data / "labels_real.json", data / "labels_synth.json", "team_alpha")
+
+    sub.write_bytes(gzip.compress(sub.read_bytes()))
+    for name in ["products.json", "queries_real.json", "labels_real.json"]:
+        (data / name).write_bytes(lzma.compress((data / name).read_bytes()))
+
+    report = validate_submission(
+        sub, data / "products.json", data / "queries_real.json", data / "queries_synth.json", "team_alpha"
+    )
+    assert report["status"] == "passed", report["errors"]
+    assert full_evaluation(sub, data / "labels_real.json", data / "labels_synth.json", "team_alpha") == plain
+    streamed = full_evaluation(
+        sub, data / "labels_real.json", data / "labels_synth.json", "team_alpha", memory_limit_mb=1
+    )
+    assert streamed == plain
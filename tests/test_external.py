@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tamu25.evaluate import full_evaluation
+from tamu25.external import sorted_query_groups
+from tamu25.validate import validate_submission
+from tests.conftest import read_json
+
+# ~4 buffered rows per run, so the sample submissions spill many runs
+TINY_MB = 0.001
+
+
+def test_sorted_query_groups_spills_and_merges(tmp_path: Path):
+    fields = [("Q2", 2, "a"), ("Q1", 3, "x"), ("Q2", 1, "b"), ("Q1", 1, "y"), ("Q3", 1, "z"), ("Q1", 2, "w")] * 2
+    groups = list(sorted_query_groups(fields, TINY_MB, tmp_dir=tmp_path))
+    assert [qid for qid, _ in groups] == ["Q1", "Q2", "Q3"]
+    # stable: the two copies of each (query, rank) keep their input order
+    assert groups[0][1] == [(1, "y"), (1, "y"), (2, "w"), (2, "w"), (3, "x"), (3, "x")]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sorted_query_groups_merges_in_passes(tmp_path: Path, monkeypatch):
+    import tamu25.external as external
+
+    fields = [(f"Q{i % 7}", i, f"p{i}") for i in range(60, 0, -1)] + [("Q1", 5, "dup")]
+    open_runs = []
+    read_run = external._read_run
+
+    def counting_read_run(path):
+        open_runs.append(path)
+        yield from read_run(path)
+
+    monkeypatch.setattr(external, "_read_run", counting_read_run)
+    groups = list(sorted_query_groups(fields, TINY_MB, tmp_dir=tmp_path, fan_in=3))
+    expected = {}
+    for qid, rank, pid in sorted(fields, key=lambda x: (x[0], x[1])):
+        expected.setdefault(qid, []).append((rank, pid))
+    assert groups == list(expected.items())
+    # more than one pass was needed, and the runs are gone afterwards
+    assert any(path.name.startswith("pass-") for path in open_runs)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_external_validation_reports_unknown_products(passing_workdir: Path):
+    sub_path = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    rows = read_json(sub_path)
+    rows[0]["product_id"] = "not-a-product"
+    sub_path.write_text(json.dumps(rows), encoding="utf-8")
+    kwargs = dict(
+        submission_path=sub_path,
+        products_path=passing_workdir / "data" / "products.json",
+        queries_real_path=passing_workdir / "data" / "queries_real.json",
+        queries_synth_path=passing_workdir / "data" / "queries_synth.json",
+        team="team_alpha",
+    )
+    in_memory = validate_submission(**kwargs)
+    external = validate_submission(memory_limit_mb=TINY_MB, **kwargs)
+    assert external["errors"] == in_memory["errors"]
+    assert any("unknown product_id 'not-a-product'" in e for e in external["errors"])
+
+
+def test_external_evaluation_matches_in_memory(workdir: Path):
+    kwargs = dict(
+        submission_path=workdir / "teams" / "team_alpha" / "submission.json",
+        labels_real_path=workdir / "data" / "labels_real.json",
+        labels_synth_path=workdir / "data" / "labels_synth.json",
+        team="team_alpha",
+    )
+    in_memory = full_evaluation(**kwargs)
+    external = full_evaluation(memory_limit_mb=TINY_MB, **kwargs)
+    for section in ["real", "synthetic"]:
+        segments, external_segments = in_memory[section].pop("segments"), external[section].pop("segments")
+        for dim, values in segments.items():
+            assert external_segments[dim].keys() == values.keys()
+            for segment, metrics in values.items():
+                assert external_segments[dim][segment] == pytest.approx(metrics, abs=1e-4)
+        assert external[section] == pytest.approx(in_memory[section], abs=1e-4)
+
+
+@pytest.mark.parametrize("fixture", ["workdir", "passing_workdir"])
+def test_external_validation_matches_in_memory(fixture: str, request):
+    workdir = request.getfixturevalue(fixture)
+    sub_path = workdir / "teams" / "team_alpha" / "submission.json"
+    rows = read_json(sub_path)
+    rows.append(dict(rows[0]))  # duplicate pair
+    sub_path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    kwargs = dict(
+        submission_path=sub_path,
+        products_path=workdir / "data" / "products.json",
+        queries_real_path=workdir / "data" / "queries_real.json",
+        queries_synth_path=workdir / "data" / "queries_synth.json",
+        team="team_alpha",
+    )
+    in_memory = validate_submission(**kwargs)
+    external = validate_submission(memory_limit_mb=TINY_MB, **kwargs)
+    assert external["status"] == in_memory["status"] == "failed"
+    assert sorted(external["errors"]) == sorted(in_memory["errors"])
+    assert external["queries_checked"] == in_memory["queries_checked"]
+    assert external["avg_depth"] == in_memory["avg_depth"]
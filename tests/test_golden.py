@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tamu25.evaluate import evaluate_submission
+from tamu25.golden import build_ideal_dcg_table, ideal_dcg_path, load_golden_set, load_labels
+from tamu25.metrics import ideal_dcg_at_k
+
+
+def _write(path: Path, obj) -> Path:
+    path.write_text(json.dumps(obj), encoding="utf-8")
+    return path
+
+
+def test_ideal_dcg_table_round_trip(workdir: Path):
+    labels = workdir / "data" / "labels_real.json"
+    out = build_ideal_dcg_table(labels)
+    assert out == ideal_dcg_path(labels) == workdir / "data" / "labels_real.idcg.json"
+
+    _, table = load_labels(labels)
+    assert table is not None
+    golden = load_golden_set(labels)
+    for qid in golden.queries.ids:
+        rels = sorted((r["relevance"] for r in json.loads(labels.read_text()) if r["query_id"] == qid), reverse=True)
+        assert golden.ideal_dcg_at(qid, 10) == pytest.approx(ideal_dcg_at_k(rels, 10))
+        assert table[10][qid] == pytest.approx(golden.ideal_dcg_at(qid, 10))
+
+
+def test_stale_ideal_dcg_table_is_ignored(workdir: Path):
+    labels = workdir / "data" / "labels_real.json"
+    build_ideal_dcg_table(labels)
+    rows = json.loads(labels.read_text())
+    rows[0]["relevance"] = 0
+    _write(labels, rows)
+    _, table = load_labels(labels)
+    assert table is None
+
+
+def test_ndcg_is_normalized_by_judged_ideal(tmp_path: Path):
+    labels = _write(
+        tmp_path / "labels.json",
+        [
+            {"query_id": "Q1", "product_id": "a", "relevance": 3},
+            {"query_id": "Q1", "product_id": "b", "relevance": 3},
+        ],
+    )
+    # only one of the two relevant products is retrieved
+    sub = _write(tmp_path / "sub.json", [{"query_id": "Q1", "rank": 1, "product_id": "a"}])
+    ndcg = evaluate_submission(sub, labels)["nDCG@10"]
+    assert 0 < ndcg < 1
+
+    # a precomputed table gives the same score
+    build_ideal_dcg_table(labels)
+    assert evaluate_submission(sub, labels)["nDCG@10"] == pytest.approx(ndcg)
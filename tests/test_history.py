@@ -0,0 +1,90 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from tamu25.history import LeaderboardHistory, normalize_ts
+from tamu25.leaderboard import _leaderboard_row, build_leaderboard, write_run
+from tests.conftest import read_json
+
+
+def _report(team: str, final: float) -> dict:
+    metrics = {"nDCG@10": final, "AP@20": final, "P@10": final, "R@30": final, "composite": final, "queries_scored": 3}
+    return {"team": team, "synthetic": metrics, "combined": {"weighted_final": final, "weights": {"synthetic": 1.0}}}
+
+
+def _write(lb: Path, team: str, run_id: str, final: float, ts: str) -> None:
+    write_run(lb, team, run_id, _report(team, final), {"team": team, "pipeline_id": run_id, "timestamp_utc": ts})
+
+
+def test_history_queries(tmp_path: Path):
+    lb = tmp_path / "leaderboard"
+    _write(lb, "alpha", "1", 0.50, "2025-11-08T10:00:00Z")
+    _write(lb, "bravo", "2", 0.40, "2025-11-08T11:00:00Z")
+    _write(lb, "alpha", "3", 0.30, "2025-11-08T12:00:00Z")
+    with LeaderboardHistory(tmp_path / "history.sqlite") as history:
+        assert history.import_runs(lb / "runs") == 3
+        assert history.import_runs(lb / "runs") == 0
+
+        assert [(r["team"], r["weighted_final"]) for r in history.best_per_team()] == [("alpha", 0.5), ("bravo", 0.4)]
+        assert [r["weighted_final"] for r in history.trajectory("alpha")] == [0.5, 0.3]
+        # alpha's latest run dropped it below bravo
+        assert history.standings() == {"bravo": 1, "alpha": 2}
+        assert history.standings(until_ts="2025-11-08T11:30:00Z") == {"alpha": 1, "bravo": 2}
+        assert history.rank_changes(since_ts="2025-11-08T11:30:00Z") == [
+            {"team": "bravo", "rank": 1, "previous_rank": 2},
+            {"team": "alpha", "rank": 2, "previous_rank": 1},
+        ]
+
+        feed = history.feed(cursor=2)
+        assert feed["cursor"] == 3
+        assert [r["pipeline_id"] for r in feed["runs"]] == ["3"]
+        assert history.feed(cursor=feed["cursor"]) == {"cursor": 3, "runs": [], "rank_changes": []}
+
+
+def test_build_leaderboard_matches_latest_per_team(tmp_path: Path):
+    lb = tmp_path / "leaderboard"
+    _write(lb, "alpha", "1", 0.50, "2025-11-08T10:00:00Z")
+    _write(lb, "bravo", "2", 0.40, "2025-11-08T11:00:00Z")
+    rows = build_leaderboard(lb)
+    _write(lb, "alpha", "3", 0.30, "2025-11-08T12:00:00Z")
+    _write(lb, "charlie", "4", 0.35, "2025-11-08T13:00:00Z")
+    rows = build_leaderboard(lb)
+
+    assert [(r["team"], r["pipeline_id"]) for r in rows] == [("bravo", "2"), ("charlie", "4"), ("alpha", "3")]
+    meta = {"team": "alpha", "pipeline_id": "3", "timestamp_utc": "2025-11-08T12:00:00Z"}
+    assert rows[2] == _leaderboard_row("alpha", _report("alpha", 0.30), meta)
+    assert read_json(lb / "leaderboard.json") == {"rows": rows}
+    feed_lines = (lb / "feed.jsonl").read_text().splitlines()
+    assert len(feed_lines) == 2
+    assert "charlie" in feed_lines[1]
+
+
+def test_import_skips_unchanged_team_dirs(tmp_path: Path, monkeypatch):
+    lb = tmp_path / "leaderboard"
+    _write(lb, "alpha", "1", 0.50, "2025-11-08T10:00:00Z")
+    _write(lb, "bravo", "2", 0.40, "2025-11-08T11:00:00Z")
+    for team_dir in (lb / "runs").iterdir():
+        os.utime(team_dir, ns=(10**18, 10**18))  # settled long ago
+    with LeaderboardHistory(tmp_path / "history.sqlite") as history:
+        assert history.import_runs(lb / "runs") == 2
+
+        listed = []
+        iterdir = Path.iterdir
+        monkeypatch.setattr(Path, "iterdir", lambda self: listed.append(self.name) or iterdir(self))
+        assert history.import_runs(lb / "runs") == 0
+        assert listed == []
+
+        # a new run changes its team directory's mtime, so only that team is listed again
+        _write(lb, "alpha", "3", 0.30, "2025-11-08T12:00:00Z")
+        assert history.import_runs(lb / "runs") == 1
+        assert listed == ["alpha"]
+
+
+def test_rank_changes_rejects_malformed_since(tmp_path: Path):
+    assert normalize_ts("2025-11-08T13:00:00+01:00") == "2025-11-08T12:00:00Z"
+    assert normalize_ts("2025-11-08") == "2025-11-08T00:00:00Z"
+    with LeaderboardHistory(tmp_path / "history.sqlite") as history:
+        with pytest.raises(ValueError, match="invalid timestamp"):
+            history.rank_changes(since_ts="2026-1-5")
+        assert history.rank_changes(since_ts="2025-11-08T13:00:00+01:00") == []
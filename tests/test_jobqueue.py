@@ -0,0 +1,89 @@
+import threading
+import time
+from pathlib import Path
+
+from tamu25.jobqueue import SubmissionQueue
+
+
+def _submission(tmp_path: Path, name: str, content: str) -> Path:
+    path = tmp_path / "subs" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_newer_submission_supersedes_queued_one(tmp_path: Path):
+    with SubmissionQueue(tmp_path / "queue") as queue:
+        first = queue.enqueue("team_a", _submission(tmp_path, "a1.json", "[1]"))
+        second = queue.enqueue("team_a", _submission(tmp_path, "a2.json", "[2]"))
+        assert queue.enqueue("team_a", _submission(tmp_path, "a3.json", "[2]")) == second
+        states = {job["id"]: job["state"] for job in queue.jobs()}
+        assert states == {first: "superseded", second: "queued"}
+        assert queue.stats()["depth"] == 1
+
+
+def test_teams_are_served_least_recently_first(tmp_path: Path):
+    with SubmissionQueue(tmp_path / "queue") as queue:
+        queue.enqueue("team_a", _submission(tmp_path, "a1.json", "[1]"))
+        job = queue.claim()
+        queue.complete(job["id"], {"score": 1})
+
+        queue.enqueue("team_a", _submission(tmp_path, "a2.json", "[2]"))
+        queue.enqueue("team_b", _submission(tmp_path, "b1.json", "[3]"))
+        assert queue.claim()["team"] == "team_b"
+        assert queue.claim()["team"] == "team_a"
+        assert queue.claim() is None
+
+
+def test_drain_bounds_workers_and_reuses_scored_content(tmp_path: Path):
+    lock = threading.Lock()
+    active, peak, handled = [0], [0], []
+
+    def handler(job):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+            handled.append(job["team"])
+        return {"team": job["team"], "digest": job["digest"]}
+
+    published = []
+
+    def drain(queue: SubmissionQueue, inputs: str = "labels-v1") -> int:
+        return queue.drain(
+            handler, max_workers=2, on_result=lambda job, result: published.append(job["id"]), inputs=inputs
+        )
+
+    with SubmissionQueue(tmp_path / "queue") as queue:
+        for i in range(5):
+            queue.enqueue(f"team_{i}", _submission(tmp_path, f"{i}.json", f"[{i}]"))
+        assert drain(queue) == 5
+        assert peak[0] <= 2
+        assert sorted(handled) == [f"team_{i}" for i in range(5)]
+
+        # team_0 resubmits, then reverts to its already scored submission: nothing is re-scored,
+        # but the revert is still published as the team's latest run
+        queue.enqueue("team_0", _submission(tmp_path, "0b.json", "[changed]"))
+        revert = queue.enqueue("team_0", tmp_path / "subs" / "0.json")
+        assert drain(queue) == 0
+        assert published[-1] == revert
+        assert queue.result(revert) == queue.result(1)
+
+        # a byte-identical submission from another team reuses the result too
+        copy = queue.enqueue("team_9", tmp_path / "subs" / "1.json")
+        assert drain(queue) == 0
+        assert published[-1] == copy
+        assert queue._job(copy)["duplicate_of"] == 2
+
+        # scored against other inputs (new labels, queries, catalog, ...) the same content is scored again
+        rescored = queue.enqueue("team_9", tmp_path / "subs" / "1.json")
+        assert drain(queue, inputs="labels-v2") == 1
+        assert published[-1] == rescored
+        assert queue._job(rescored)["duplicate_of"] is None
+
+        stats = queue.stats()
+        assert stats["depth"] == 0
+        assert stats["states"] == {"done": 8, "superseded": 1}
+        assert stats["wait_p50"] is not None
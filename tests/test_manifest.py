@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from tamu25.cache import ValidationCache
+from tamu25.compression import compress_file
+from tamu25.evaluate import full_evaluation
+from tamu25.manifest import MANIFEST_VERSION, Manifest, StaleManifestError, build_manifest
+from tamu25.pipeline import run_pipeline
+from tamu25.storage import LocalStorage
+from tamu25.validate import validate_submission
+from tests.conftest import read_json
+
+
+def _build(workdir: Path) -> Manifest:
+    data = workdir / "data"
+    return build_manifest(
+        "test",
+        [data / "queries_real.json", data / "queries_synth.json"],
+        {"synthetic": data / "labels_synth.json", "real": data / "labels_real.json"},
+        out=data / "manifest_test.json",
+    )
+
+
+def test_manifest_round_trip(workdir: Path):
+    data = workdir / "data"
+    built = _build(workdir)
+    loaded = Manifest.load(data / "manifest_test.json")
+
+    files = ("queries_real.json", "queries_synth.json")
+    expected = sorted(q["query_id"] for name in files for q in read_json(data / name))
+    assert loaded.queries.ids == expected == built.queries.ids
+    assert loaded.to_dict() == built.to_dict()
+    qid = read_json(data / "queries_synth.json")[0]["query_id"]
+    assert qid in loaded
+    assert loaded.query_words()[qid] == len(read_json(data / "queries_synth.json")[0]["query"].split())
+
+    labels = [r for r in read_json(data / "labels_synth.json") if r["query_id"] == qid]
+    relevant = sum(1 for r in labels if r["relevance"] >= 1)
+    assert loaded.label_counts("synthetic", qid) == (len(labels), relevant)
+    assert loaded.label_counts("synthetic", "nope") == (0, 0)
+
+
+def test_old_manifest_version_is_rejected(workdir: Path):
+    _build(workdir)
+    path = workdir / "data" / "manifest_test.json"
+    manifest = read_json(path)
+    manifest["version"] = MANIFEST_VERSION - 1
+    path.write_text(json.dumps(manifest), encoding="utf-8")
+    with pytest.raises(ValueError, match="rebuild"):
+        Manifest.load(path)
+
+
+def test_changed_inputs_are_refused(workdir: Path):
+    data = workdir / "data"
+    manifest = _build(workdir)
+    manifest.check_labels("synthetic", data / "labels_synth.json")
+    manifest.check_sources()
+    with pytest.raises(StaleManifestError):
+        manifest.check_labels("synthetic", data / "labels_real.json")
+
+    labels = data / "labels_synth.json"
+    labels.write_text(labels.read_text() + "\n", encoding="utf-8")
+    with pytest.raises(StaleManifestError):
+        manifest.check_labels("synthetic", labels)
+    queries = data / "queries_real.json"
+    queries.write_text(queries.read_text() + "\n", encoding="utf-8")
+    with pytest.raises(StaleManifestError):
+        manifest.check_sources()
+
+
+def test_validate_with_manifest_matches_query_files(passing_workdir: Path):
+    data = passing_workdir / "data"
+    _build(passing_workdir)
+    submission = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    args = (submission, data / "products.json")
+    from_files = validate_submission(*args, data / "queries_real.json", data / "queries_synth.json", "team_alpha")
+    from_manifest = validate_submission(*args, None, None, "team_alpha", manifest_path=data / "manifest_test.json")
+    assert from_files["status"] == from_manifest["status"] == "passed"
+    assert from_manifest == from_files
+
+    # the query files are not needed once the manifest exists
+    (data / "queries_synth.json").unlink()
+    report = validate_submission(*args, None, None, "team_alpha", manifest_path=data / "manifest_test.json")
+    assert report["status"] == "passed"
+
+
+def test_stale_manifest_is_refused_before_the_validation_cache(passing_workdir: Path):
+    data = passing_workdir / "data"
+    _build(passing_workdir)
+    cache = ValidationCache(passing_workdir / "cache")
+    args = (passing_workdir / "teams" / "team_alpha" / "submission.json", data / "products.json", None, None)
+    manifest = data / "manifest_test.json"
+    assert validate_submission(*args, "team_alpha", cache=cache, manifest_path=manifest)["status"] == "passed"
+
+    queries = data / "queries_real.json"
+    queries.write_text(json.dumps(read_json(queries) + [{"query_id": "Q999", "query": "new query"}]), encoding="utf-8")
+    with pytest.raises(StaleManifestError):
+        validate_submission(*args, "team_alpha", cache=cache, manifest_path=manifest)
+
+
+@pytest.mark.parametrize("memory_limit_mb", [None, 1])
+def test_evaluate_with_manifest_matches_query_files(passing_workdir: Path, memory_limit_mb: float | None):
+    data = passing_workdir / "data"
+    submission = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    _build(passing_workdir)
+    labels = (data / "labels_real.json", data / "labels_synth.json")
+    from_files = full_evaluation(
+        submission,
+        *labels,
+        "team_alpha",
+        memory_limit_mb=memory_limit_mb,
+        queries_paths=[data / "queries_real.json", data / "queries_synth.json"],
+    )
+    from_manifest = full_evaluation(
+        submission, *labels, "team_alpha", memory_limit_mb=memory_limit_mb, manifest_path=data / "manifest_test.json"
+    )
+    assert from_manifest == from_files
+    assert "length" in from_manifest["synthetic"]["segments"]
+
+    # label files must be the ones the manifest was built from
+    with pytest.raises(StaleManifestError):
+        swapped = (data / "labels_synth.json", data / "labels_real.json")
+        full_evaluation(submission, *swapped, "team_alpha", manifest_path=data / "manifest_test.json")
+
+
+def test_compressed_labels_match_the_manifest(passing_workdir: Path):
+    data = passing_workdir / "data"
+    _build(passing_workdir)
+    submission = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    args = {"team": "team_alpha", "labels_real_path": None, "manifest_path": data / "manifest_test.json"}
+    plain = full_evaluation(submission, labels_synth_path=data / "labels_synth.json", **args)
+    # the gzip objects the bucket holds hash like the plain file
+    gz = compress_file(data / "labels_synth.json")
+    assert full_evaluation(submission, labels_synth_path=gz, **args) == plain
+
+
+def test_sources_are_checked_from_any_directory(passing_workdir: Path, monkeypatch, caplog):
+    data = passing_workdir / "data"
+    monkeypatch.chdir(data)
+    build_manifest("test", ["queries_real.json", "queries_synth.json"], {"synthetic": "labels_synth.json"}, "m.json")
+    monkeypatch.chdir(passing_workdir)
+    manifest = Manifest.load(data / "m.json")
+    assert all(Path(source["path"]).is_absolute() for source in manifest.sources)
+    manifest.check_sources()
+
+    queries = data / "queries_real.json"
+    queries.write_text(queries.read_text() + "\n", encoding="utf-8")
+    with pytest.raises(StaleManifestError):
+        manifest.check_sources()
+
+    # a missing source cannot be checked; that is logged rather than silently skipped
+    queries.unlink()
+    with caplog.at_level(logging.WARNING, logger="tamu25.manifest"):
+        manifest.check_sources()
+    assert "queries_real.json is missing" in caplog.text
+
+
+def _run_with_manifest(passing_workdir: Path) -> dict:
+    data = passing_workdir / "data"
+    return asyncio.run(
+        run_pipeline(
+            submission_path=passing_workdir / "teams" / "team_alpha" / "submission.json",
+            products_path=data / "products.json",
+            queries_synth_path=None,
+            labels_synth_blob="labels_synth.json",
+            team="team_alpha",
+            storage=LocalStorage(data),
+            labels_real_blob="labels_real.json",
+            out_dir=passing_workdir / "out",
+            manifest_path=data / "manifest_test.json",
+        )
+    )
+
+
+def test_pipeline_with_manifest_matches_evaluate(passing_workdir: Path):
+    data = passing_workdir / "data"
+    _build(passing_workdir)
+    result = _run_with_manifest(passing_workdir)
+    assert result["validation"]["status"] == "passed"
+    expected = full_evaluation(
+        passing_workdir / "teams" / "team_alpha" / "submission.json",
+        data / "labels_real.json",
+        data / "labels_synth.json",
+        "team_alpha",
+        manifest_path=data / "manifest_test.json",
+    )
+    assert result["score"] == expected
+
+
+def test_pipeline_refuses_labels_that_do_not_match_the_manifest(passing_workdir: Path):
+    data = passing_workdir / "data"
+    _build(passing_workdir)
+    labels = data / "labels_synth.json"
+    labels.write_text(labels.read_text() + "\n", encoding="utf-8")
+    with pytest.raises(StaleManifestError):
+        _run_with_manifest(passing_workdir)
+    assert not (passing_workdir / "out" / "score_report.json").exists()
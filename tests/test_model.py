@@ -0,0 +1,35 @@
+from tamu25.model import GoldenSet, IdIndex, Submission
+from tamu25.serialization import LabelRow, SubmissionRow
+
+
+def test_submission_groups_and_sorts_by_rank():
+    rows = [
+        SubmissionRow("Q2", 2, "b"),
+        SubmissionRow("Q1", 2, "a"),
+        SubmissionRow("Q2", 1, "c"),
+        SubmissionRow("Q1", 1, "b"),
+    ]
+    products = IdIndex()
+    sub = Submission.from_rows(rows, products)
+    assert len(sub) == 4
+    assert list(sub.offsets) == [0, 2, 4]
+    views = list(sub)
+    # queries keep first-appearance order
+    assert [v.query_id for v in views] == ["Q2", "Q1"]
+    assert list(views[0].ranks) == [1, 2]
+    assert [products.ids[p] for p in views[0].products] == ["c", "b"]
+    assert [products.ids[p] for p in views[1].products] == ["b", "a"]
+
+
+def test_golden_set_shares_product_index():
+    products = IdIndex(["a", "b", "c"])
+    golden = GoldenSet.from_rows(
+        [LabelRow("Q1", "b", 3), LabelRow("Q2", "a", 0), LabelRow("Q1", "d", 1), LabelRow("Q1", "c", 0)],
+        products,
+    )
+    assert products.get("d") == 3
+    assert golden.relevance_map("Q1") == {1: 3, 3: 1, 2: 0}
+    assert golden.relevant_count("Q1") == 2
+    assert golden.relevant_count("Q2") == 0
+    assert golden.relevance_map("missing") == {}
+    assert golden.relevant_count("missing") == 0
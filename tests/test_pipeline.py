@@ -0,0 +1,113 @@
+import asyncio
+import json
+from pathlib import Path
+
+from tamu25 import model
+from tamu25.evaluate import full_evaluation
+from tamu25.golden import build_ideal_dcg_table
+from tamu25.pipeline import publish_score, run_pipeline, scoring_inputs_digest
+from tamu25.storage import LocalStorage
+from tamu25.validate import validate_submission
+from tests.conftest import read_json
+
+
+def _run(workdir: Path, **kwargs):
+    return asyncio.run(
+        run_pipeline(
+            submission_path=workdir / "teams" / "team_alpha" / "submission.json",
+            products_path=workdir / "data" / "products.json",
+            queries_synth_path=workdir / "data" / "queries_synth.json",
+            labels_synth_blob="labels_synth.json",
+            team="team_alpha",
+            storage=LocalStorage(workdir / "data"),
+            queries_real_path=workdir / "data" / "queries_real.json",
+            out_dir=workdir / "out",
+            **kwargs,
+        )
+    )
+
+
+def test_pipeline_matches_full_evaluation(passing_workdir: Path):
+    result = _run(passing_workdir, labels_real_blob="labels_real.json", run_id="101")
+    assert result["validation"]["status"] == "passed", result["validation"]
+    expected = full_evaluation(
+        submission_path=passing_workdir / "teams" / "team_alpha" / "submission.json",
+        labels_real_path=passing_workdir / "data" / "labels_real.json",
+        labels_synth_path=passing_workdir / "data" / "labels_synth.json",
+        team="team_alpha",
+        queries_paths=[passing_workdir / "data" / "queries_real.json", passing_workdir / "data" / "queries_synth.json"],
+    )
+    assert result["score"] == expected
+    assert read_json(passing_workdir / "out" / "score_report.json") == expected
+    assert read_json(passing_workdir / "out" / "validation_report.json")["status"] == "passed"
+    assert read_json(passing_workdir / "out" / "metadata.json")["pipeline_id"] == "101"
+
+
+def test_pipeline_publishes_leaderboard(passing_workdir: Path):
+    leaderboard_dir = passing_workdir / "leaderboard"
+    result = _run(passing_workdir, leaderboard_dir=leaderboard_dir, run_id="7")
+    run_dir = leaderboard_dir / "runs" / "team_alpha" / "7"
+    assert read_json(run_dir / "score_report.json") == result["score"]
+    rows = read_json(leaderboard_dir / "leaderboard.json")["rows"]
+    assert [r["team"] for r in rows] == ["team_alpha"]
+    assert rows[0]["weighted_final"] == result["score"]["combined"]["weighted_final"]
+    assert "team_alpha" in (leaderboard_dir / "leaderboard.md").read_text()
+
+
+def test_pipeline_failed_validation_skips_score(workdir: Path):
+    leaderboard_dir = workdir / "leaderboard"
+    result = _run(workdir, leaderboard_dir=leaderboard_dir)
+    assert result["validation"]["status"] == "failed"
+    assert result["score"] is None
+    assert json.loads((workdir / "out" / "validation_report.json").read_text())["status"] == "failed"
+    assert not (workdir / "out" / "score_report.json").exists()
+    assert not leaderboard_dir.exists()
+
+
+def test_pipeline_uses_prepared_ideal_dcg_tables(passing_workdir: Path, monkeypatch):
+    expected = _run(passing_workdir, labels_real_blob="labels_real.json")["score"]
+    for name in ("labels_synth.json", "labels_real.json"):
+        build_ideal_dcg_table(passing_workdir / "data" / name)
+
+    def recompute(*args):
+        raise AssertionError("ideal DCG recomputed despite a prepared table")
+
+    monkeypatch.setattr(model, "ideal_dcg_at_k", recompute)
+    result = _run(passing_workdir, labels_real_blob="labels_real.json")
+    assert result["score"]["combined"] == expected["combined"]
+
+
+def test_publish_score_stamps_the_publishing_team(passing_workdir: Path):
+    score = _run(passing_workdir)["score"]
+    lb = passing_workdir / "leaderboard"
+    publish_score(lb, "team_bravo", "7", score, passing_workdir / "teams" / "team_alpha" / "submission.json")
+    published = read_json(lb / "runs" / "team_bravo" / "7" / "score_report.json")
+    assert published["team"] == "team_bravo"
+    assert published["combined"] == score["combined"]
+
+
+def test_pipeline_validation_matches_validate_submission(passing_workdir: Path):
+    data = passing_workdir / "data"
+    submission = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    args = (submission, data / "products.json", data / "queries_real.json", data / "queries_synth.json", "team_alpha")
+    assert _run(passing_workdir)["validation"] == validate_submission(*args)
+
+    # a mistyped row takes the untyped fallback in both
+    rows = read_json(submission)
+    rows[0]["rank"] = str(rows[0]["rank"])
+    submission.write_text(json.dumps(rows), encoding="utf-8")
+    report = _run(passing_workdir)["validation"]
+    assert report["status"] == "failed"
+    assert report == validate_submission(*args)
+
+
+def test_scoring_inputs_digest_tracks_labels(passing_workdir: Path):
+    data = passing_workdir / "data"
+    storage = LocalStorage(data)
+    args = (storage, data / "products.json", data / "queries_synth.json", "labels_synth.json")
+    digest = scoring_inputs_digest(*args)
+    assert scoring_inputs_digest(*args) == digest
+    assert scoring_inputs_digest(*args, labels_real_blob="labels_real.json") != digest
+    labels = data / "labels_synth.json"
+    labels.write_text(labels.read_text() + "\n", encoding="utf-8")
+    assert scoring_inputs_digest(*args) != digest
@@ -0,0 +1,65 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from tamu25.evaluate import evaluate_submission
+from tamu25.preview import preview_evaluation, preview_submission
+
+
+@pytest.fixture
+def large_split(tmp_path: Path) -> tuple[Path, Path]:
+    """400 queries with 0-8 relevant labels each and a submission that finds some of them."""
+    rnd = random.Random(7)
+    labels, rows = [], []
+    for q in range(400):
+        qid = f"Q{q:04d}"
+        judged = [f"P{q}-{i}" for i in range(rnd.randint(1, 10))]
+        for i, pid in enumerate(judged):
+            labels.append({"query_id": qid, "product_id": pid, "relevance": rnd.choice([0, 1, 2, 3]) if i < 8 else 0})
+        ranked = rnd.sample(judged, rnd.randint(0, len(judged))) + [f"X{q}-{i}" for i in range(30)]
+        rows += [{"query_id": qid, "rank": r, "product_id": pid} for r, pid in enumerate(ranked[:30], 1)]
+    labels_path = tmp_path / "labels.json"
+    sub_path = tmp_path / "submission.json"
+    labels_path.write_text(json.dumps(labels), encoding="utf-8")
+    sub_path.write_text(json.dumps(rows), encoding="utf-8")
+    return sub_path, labels_path
+
+
+def test_preview_samples_until_tolerance(large_split):
+    sub, labels = large_split
+    full = evaluate_submission(sub, labels)
+    preview = preview_submission(sub, labels, tolerance=0.05)
+    assert preview["queries_total"] == 400
+    assert preview["queries_scored"] < 400
+    assert 0 < preview["composite_bound"] <= 0.05
+    assert abs(preview["composite"] - full["composite"]) <= preview["composite_bound"]
+    # deterministic for a fixed seed
+    assert preview_submission(sub, labels, tolerance=0.05) == preview
+
+
+def test_preview_with_zero_tolerance_is_exact(large_split):
+    sub, labels = large_split
+    full = evaluate_submission(sub, labels)
+    preview = preview_submission(sub, labels, tolerance=0.0)
+    assert preview["queries_scored"] == 400
+    assert preview["composite_bound"] == 0.0
+    for name in ("nDCG@10", "AP@20", "P@10", "R@30", "composite"):
+        assert preview[name] == pytest.approx(full[name], abs=1e-4)
+
+
+def test_preview_evaluation_report(workdir: Path):
+    report = preview_evaluation(
+        submission_path=workdir / "teams" / "team_alpha" / "submission.json",
+        labels_real_path=workdir / "data" / "labels_real.json",
+        labels_synth_path=workdir / "data" / "labels_synth.json",
+        team="team_alpha",
+    )
+    assert report["preview"] is True
+    assert set(report) >= {"real", "synthetic", "combined"}
+    assert report["combined"]["bound"] >= 0
+    # one shared parse of the submission gives the same per-split estimates
+    for split, labels in (("real", "labels_real.json"), ("synthetic", "labels_synth.json")):
+        alone = preview_submission(workdir / "teams" / "team_alpha" / "submission.json", workdir / "data" / labels)
+        assert report[split] == alone
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+from tamu25.evaluate import full_evaluation
+from tamu25.leaderboard import _leaderboard_row, to_markdown
+from tamu25.model import GoldenSet
+from tamu25.segments import Segmentation
+from tamu25.serialization import LabelRow
+
+
+def test_segment_means_match_per_query_metrics():
+    golden = GoldenSet.from_rows(
+        [LabelRow("Q1", "a", 3), LabelRow("s1", "a", 2), LabelRow("s1", "b", 1), LabelRow("s2", "c", 0)]
+    )
+    seg = Segmentation(golden, {"Q1": 1, "s1": 4, "s2": 6})
+    metrics = {name: [0.2, 0.4, 0.9] for name in ("nDCG@10", "AP@20", "P@10", "R@30", "composite")}
+    result = seg.reduce(["Q1", "s1", "s2"], metrics)
+
+    assert result["set"]["real"] == {"queries": 1, **{name: 0.2 for name in metrics}}
+    assert result["set"]["synthetic"]["queries"] == 2
+    assert result["set"]["synthetic"]["composite"] == pytest.approx(0.65)
+    assert {k: v["queries"] for k, v in result["relevant"].items()} == {"0": 1, "1-2": 2}
+    assert {k: v["queries"] for k, v in result["length"].items()} == {"1-2 words": 1, "3-4 words": 1, "5+ words": 1}
+    # queries missing from the golden set and the query files still get segments
+    assert seg.reduce(["Q9"], {name: [1.0] for name in metrics})["length"] == {
+        "unknown": {"queries": 1, **{name: 1.0 for name in metrics}}
+    }
+    # the sample data uses upper-case synthetic ids
+    assert set(seg.reduce(["S7"], {name: [1.0] for name in metrics})["set"]) == {"synthetic"}
+
+
+def test_score_report_has_segments(workdir: Path):
+    data = workdir / "data"
+    report = full_evaluation(
+        workdir / "teams" / "team_alpha" / "submission.json",
+        data / "labels_real.json",
+        data / "labels_synth.json",
+        "team_alpha",
+        queries_paths=[data / "queries_real.json", data / "queries_synth.json"],
+    )
+    for split in ("real", "synthetic"):
+        segments = report[split]["segments"]
+        assert set(segments) == {"set", "relevant", "length"}
+        for dim in segments.values():
+            # every dimension partitions the scored queries
+            assert sum(s["queries"] for s in dim.values()) == report[split]["queries_scored"]
+            weighted = sum(s["queries"] * s["composite"] for s in dim.values()) / report[split]["queries_scored"]
+            assert weighted == pytest.approx(report[split]["composite"], abs=1e-3)
+
+    row = _leaderboard_row("team_alpha", report, {})
+    assert row["segments"]["real"] == report["real"]["segments"]
+    assert "### Real queries by relevant" in to_markdown([row])
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from tamu25 import serialization
+from tamu25.serialization import DecodeError, LabelRow, SubmissionRow, decode_rows, iter_array
+from tamu25.validate import validate_submission
+from tests.conftest import read_json
+
+AVAILABLE = [name for name in serialization.BACKENDS if serialization._available(name)]
+
+
+@pytest.fixture(params=AVAILABLE)
+def backend(request):
+    previous = serialization.get_backend()
+    serialization.set_backend(request.param)
+    yield request.param
+    serialization.set_backend(previous)
+
+
+def test_decode_rows_typed(backend: str, sample_data_dir: Path):
+    rows = decode_rows((sample_data_dir / "labels_real.json").read_bytes(), LabelRow)
+    assert rows[0] == LabelRow("Q001", "0001", 3)
+    assert rows[0].relevance == 3
+
+
+@pytest.mark.parametrize(
+    "row",
+    [
+        {"query_id": "Q001", "rank": "1", "product_id": "0001"},
+        {"query_id": "Q001", "rank": True, "product_id": "0001"},
+        {"query_id": "Q001", "product_id": "0001"},
+        ["Q001", 1, "0001"],
+    ],
+)
+def test_decode_rows_rejects_bad_rows(backend: str, row):
+    with pytest.raises(DecodeError):
+        decode_rows(json.dumps([row]), SubmissionRow)
+
+
+def test_dumps_matches_stdlib(backend: str):
+    report = {"team": "t", "errors": [], "avg_depth": None, "scores": {"nDCG@10": 0.6186, "queries_scored": 4}}
+    assert serialization.dumps(report, indent=2) == json.dumps(report, indent=2)
+    assert serialization.loads(serialization.dumps(report)) == report
+
+
+def test_validate_falls_back_to_row_checks(backend: str, workdir: Path):
+    sub_path = workdir / "teams" / "team_alpha" / "submission.json"
+    rows = read_json(sub_path)
+    del rows[0]["rank"]
+    sub_path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    report = validate_submission(
+        submission_path=sub_path,
+        products_path=workdir / "data" / "products.json",
+        queries_real_path=workdir / "data" / "queries_real.json",
+        queries_synth_path=workdir / "data" / "queries_synth.json",
+        team="team_alpha",
+    )
+    assert report["status"] == "failed"
+    assert any("row missing field(s)" in err for err in report["errors"])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 20])
+def test_iter_array_streams_elements(tmp_path: Path, chunk_size: int):
+    path = tmp_path / "rows.json"
+    path.write_text('[ {"a": [1, 2]} ,\n 12345, "x"]', encoding="utf-8")
+    assert list(iter_array(path, chunk_size)) == [{"a": [1, 2]}, 12345, "x"]
+    path.write_text(" [ ] ", encoding="utf-8")
+    assert list(iter_array(path, chunk_size)) == []
+
+
+@pytest.mark.parametrize("text", ["[1 2 3]", "[1,,2]", "[,1]", "[1,]", "[1, 2", "{}"])
+def test_iter_array_rejects_invalid_json(tmp_path: Path, text: str):
+    path = tmp_path / "rows.json"
+    path.write_text(text, encoding="utf-8")
+    for chunk_size in (1, 1 << 20):
+        with pytest.raises(DecodeError):
+            list(iter_array(path, chunk_size))
+
+
+def test_set_backend_unknown():
+    with pytest.raises(ValueError):
+        serialization.set_backend("yaml")
@@ -0,0 +1,57 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from tamu25.similarity import SimilarityIndex, rbo
+
+
+def _submission(path: Path, ranked: dict[str, list[str]]) -> Path:
+    rows = [{"query_id": q, "rank": r, "product_id": p} for q, pids in ranked.items() for r, p in enumerate(pids, 1)]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(rows), encoding="utf-8")
+    return path
+
+
+def _random_ranking(seed: int) -> dict[str, list[str]]:
+    rnd = random.Random(seed)
+    catalog = [f"{i:05d}" for i in range(2000)]
+    return {f"Q{q:03d}": rnd.sample(catalog, 30) for q in range(100)}
+
+
+def test_rbo_bounds():
+    assert rbo([1, 2, 3], [1, 2, 3]) == pytest.approx(1.0)
+    assert rbo([1, 2, 3], [4, 5, 6]) == 0.0
+    assert 0 < rbo([1, 2, 3], [2, 1, 3]) < 1
+
+
+def test_copied_submission_is_flagged(tmp_path: Path):
+    original = _random_ranking(1)
+    _submission(tmp_path / "teams" / "team_a" / "submission.json", original)
+    _submission(tmp_path / "teams" / "team_b" / "submission.json", original)
+    _submission(tmp_path / "teams" / "team_c" / "submission.json", _random_ranking(2))
+
+    with SimilarityIndex(tmp_path / "similarity.sqlite") as index:
+        assert index.add_teams(tmp_path / "teams") == 3
+        pairs = index.suspicious_pairs(min_rbo=0.5)
+    assert [(p["team_a"], p["team_b"]) for p in pairs] == [("team_a", "team_b")]
+    assert pairs[0]["rbo"] == pytest.approx(1.0)
+    assert pairs[0]["jaccard"] == 1.0
+
+
+def test_index_is_incremental(tmp_path: Path):
+    original = _random_ranking(1)
+    sub_a = _submission(tmp_path / "teams" / "team_a" / "submission.json", original)
+    with SimilarityIndex(tmp_path / "similarity.sqlite") as index:
+        assert index.add("team_a", sub_a)
+        assert not index.add("team_a", sub_a)
+
+    # a resubmission that swaps the top two results of every query is still flagged
+    tweaked = {q: [pids[1], pids[0]] + pids[2:] for q, pids in original.items()}
+    sub_b = _submission(tmp_path / "teams" / "team_b" / "submission.json", tweaked)
+    with SimilarityIndex(tmp_path / "similarity.sqlite") as index:
+        assert index.add("team_b", sub_b)
+        pairs = index.suspicious_pairs(min_rbo=0.8)
+    assert len(pairs) == 1
+    assert 0.8 <= pairs[0]["rbo"] < 1.0
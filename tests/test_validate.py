@@ -150,3 +150,42 @@ def test_validate_synthetic_only(workdir: Path):
     assert report["status"] == "passed" or "missing" in " ".join(report.get("errors", []))
     assert report["queries_checked"] >= 0
     assert report["team"] == "team_alpha"
+
+
+def test_validate_rank_out_of_range_is_reported(passing_workdir: Path):
+    sub_path = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    rows = read_json(sub_path)
+    rows[0]["rank"] = 2**31
+    sub_path.write_text(json.dumps(rows), encoding="utf-8")
+    for memory_limit_mb in (None, 1):
+        report = validate_submission(
+            submission_path=sub_path,
+            products_path=passing_workdir / "data" / "products.json",
+            queries_real_path=passing_workdir / "data" / "queries_real.json",
+            queries_synth_path=passing_workdir / "data" / "queries_synth.json",
+            team="team_alpha",
+            memory_limit_mb=memory_limit_mb,
+        )
+        assert report["status"] == "failed"
+        assert any("rank out of range" in e for e in report["errors"])
+
+
+def test_validate_mixed_id_types_are_reported(passing_workdir: Path):
+    sub_path = passing_workdir / "teams" / "team_alpha" / "submission.json"
+    rows = read_json(sub_path)
+    rows[0]["query_id"] = 7
+    sub_path.write_text(json.dumps(rows), encoding="utf-8")
+    reports = [
+        validate_submission(
+            submission_path=sub_path,
+            products_path=passing_workdir / "data" / "products.json",
+            queries_real_path=passing_workdir / "data" / "queries_real.json",
+            queries_synth_path=passing_workdir / "data" / "queries_synth.json",
+            team="team_alpha",
+            memory_limit_mb=memory_limit_mb,
+        )
+        for memory_limit_mb in (None, 1)
+    ]
+    assert reports[0] == reports[1]
+    assert reports[0]["status"] == "failed"
+    assert any("must be strings" in e for e in reports[0]["errors"])